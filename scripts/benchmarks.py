@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmarks
+==========
+Small performance checks for the calculator engine that exit non-zero
+when a budget is exceeded, so they can guard a CI job or a pre-commit hook.
+
+Usage:
+    python benchmarks.py startup [budget_ms] [runs]
+    python benchmarks.py memory [count]
+"""
+
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Cold-start budget for `import calculator_engine`, on top of bare interpreter start
+DEFAULT_STARTUP_BUDGET_MS = 150.0
+
+# Modules that must stay out of a plain engine import
+HEAVY_MODULES = ("numpy", "matplotlib")
+
+
+def _time_python(code: str, runs: int) -> List[float]:
+    """Wall-clock milliseconds for `python -c code`, once per run"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=SCRIPTS_DIR, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def startup_benchmark(budget_ms: float = DEFAULT_STARTUP_BUDGET_MS, runs: int = 5) -> bool:
+    """
+    Time a fresh-process import of the engine against a budget
+    Best-of-N, minus the time to start an empty interpreter
+    """
+    baseline = min(_time_python("pass", runs))
+    engine = min(_time_python("import calculator_engine", runs))
+    import_ms = engine - baseline
+
+    probe = subprocess.run(
+        [sys.executable, "-c",
+         "import sys, calculator_engine; "
+         f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"],
+        cwd=SCRIPTS_DIR, check=True, capture_output=True, text=True)
+    loaded = [name for name in probe.stdout.strip().split(",") if name]
+
+    print(f"Interpreter start:    {baseline:8.1f} ms")
+    print(f"Engine import:        {import_ms:8.1f} ms (budget {budget_ms:.0f} ms)")
+    print(f"Heavy modules loaded: {', '.join(loaded) or 'none'}")
+
+    ok = import_ms <= budget_ms and not loaded
+    print("PASS" if ok else "FAIL")
+    return ok
+
+
+@dataclass
+class _DictResult:
+    """The original CalculationResult layout, kept as the memory baseline"""
+    result: Any
+    formula_used: str
+    steps: List[str]
+    visualization_path: Optional[str] = None
+    metadata: Dict[str, Any] = None
+
+
+def _retained_bytes(build: Callable[[int], Any], count: int) -> int:
+    """Bytes still allocated after building `count` results (kept alive in a list)"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        results = [build(i) for i in range(count)]
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del results
+    return retained
+
+
+def memory_benchmark(count: int = 200_000) -> bool:
+    """
+    Compare per-result memory of the old dataclass layout and CalculationResult
+    Both hold the output of basic_operation in fast (explain=False) mode
+    """
+    sys.path.insert(0, SCRIPTS_DIR)
+    from calculator_engine import CalculatorEngine
+
+    engine = CalculatorEngine(explain=False)
+
+    def old_layout(i):
+        return _DictResult(result=float(i), formula_used="", steps=[],
+                           metadata={"type": "basic", "operation": "add"})
+
+    def new_layout(i):
+        return engine.basic_operation(float(i), 0.0, "add")
+
+    old = _retained_bytes(old_layout, count) / count
+    new = _retained_bytes(new_layout, count) / count
+
+    print(f"Results kept:          {count:,}")
+    print(f"Dataclass + dict/list: {old:8.1f} bytes per result")
+    print(f"CalculationResult:     {new:8.1f} bytes per result")
+    print(f"Saved:                 {1 - new / old:8.1%}")
+    return new < old
+
+
+def main():
+    """Command-line entry point"""
+    if len(sys.argv) > 1 and sys.argv[1] == "startup":
+        budget_ms = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_STARTUP_BUDGET_MS
+        runs = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+        sys.exit(0 if startup_benchmark(budget_ms, runs) else 1)
+
+    if len(sys.argv) > 1 and sys.argv[1] == "memory":
+        count = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+        sys.exit(0 if memory_benchmark(count) else 1)
+
+    print(__doc__)
+    sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Calculation History
+===================
+A fixed-capacity ring buffer of engine calls.
+
+Only numbers are kept: a timestamp, an operation code, up to
+MAX_INPUTS numeric inputs, the numeric result and the call latency, each
+in its own preallocated array. Memory is therefore fixed by the capacity
+however long the process runs, and no CalculationResult (with its steps
+and metadata) is kept alive by the history. Once full, the oldest entry
+is overwritten.
+"""
+
+import itertools
+import math
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# Numeric inputs recorded per call (missing ones are stored as NaN)
+MAX_INPUTS = 3
+
+
+class HistoryEntry(NamedTuple):
+    """One recorded engine call"""
+    timestamp: float
+    operation: str
+    inputs: Tuple[float, ...]
+    result: float
+    latency: float
+
+
+def numeric_value(value: Any) -> float:
+    """
+    The number to record for an input or result, or NaN
+    Result dicts are represented by their first numeric value
+    """
+    cls = value.__class__
+    if cls is float:
+        return value
+    if cls is str or value is None:
+        return math.nan
+    if isinstance(value, dict):
+        value = next(iter(value.values()), None)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        try:
+            return float(value)
+        except OverflowError:
+            # Integers past float range (e.g. 200!) are recorded as ±inf
+            return math.inf if value > 0 else -math.inf
+    return math.nan
+
+
+class CalculationHistory:
+    """
+    Ring buffer of (timestamp, operation, inputs, result, latency) records
+    Writers claim a slot from an atomic counter and fill it without locking,
+    so recording stays cheap and safe from several threads
+    """
+
+    def __init__(self, capacity: int = 1000):
+        """Preallocate room for `capacity` calls (0 disables recording)"""
+        if capacity < 0:
+            raise ValueError("Capacity cannot be negative")
+        self.capacity = capacity
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._op_codes = array("H", bytes(2 * capacity))
+        self._inputs = array("d", bytes(8 * capacity * MAX_INPUTS))
+        self._results = array("d", bytes(8 * capacity))
+        self._latencies = array("d", bytes(8 * capacity))
+        self._operations: List[str] = []
+        self._op_index: Dict[str, int] = {}
+        self._counter = itertools.count()
+        self.total_recorded = 0
+        self._lock = threading.Lock()
+        # Timestamps are derived from the perf_counter readings used for latency
+        self._epoch = time.time() - time.perf_counter()
+
+    def __len__(self) -> int:
+        return min(self.total_recorded, self.capacity)
+
+    def _op_code(self, operation: str) -> int:
+        with self._lock:
+            code = self._op_index.get(operation)
+            if code is None:
+                code = self._op_index[operation] = len(self._operations)
+                self._operations.append(operation)
+            return code
+
+    def record(self, operation: str, args: tuple, result: Any, start: float,
+               end: float) -> None:
+        """
+        Store one call timed by time.perf_counter() readings start/end,
+        overwriting the oldest entry when full
+        """
+        code = self._op_index.get(operation)
+        if code is None:
+            code = self._op_code(operation)
+
+        n = next(self._counter)  # Atomic: each call gets its own slot
+        i = n % self.capacity
+        self._timestamps[i] = self._epoch + end
+        self._op_codes[i] = code
+        self._results[i] = numeric_value(result)
+        self._latencies[i] = end - start
+
+        inputs = self._inputs
+        base = i * MAX_INPUTS
+        count = len(args)
+        inputs[base] = numeric_value(args[0]) if count > 0 else math.nan
+        inputs[base + 1] = numeric_value(args[1]) if count > 1 else math.nan
+        inputs[base + 2] = numeric_value(args[2]) if count > 2 else math.nan
+        self.total_recorded = n + 1
+
+    def _slots(self) -> List[int]:
+        """Buffer positions from oldest to newest"""
+        total = self.total_recorded
+        size = min(total, self.capacity)
+        return [(total - size + k) % self.capacity for k in range(size)]
+
+    def _entry(self, i: int) -> HistoryEntry:
+        return HistoryEntry(
+            timestamp=self._timestamps[i],
+            operation=self._operations[self._op_codes[i]],
+            inputs=tuple(self._inputs[i * MAX_INPUTS:(i + 1) * MAX_INPUTS]),
+            result=self._results[i],
+            latency=self._latencies[i]
+        )
+
+    def _matching(self, operation: Optional[str]) -> List[int]:
+        """Positions (oldest first) of all entries, or of one operation's entries"""
+        slots = self._slots()
+        if operation is None:
+            return slots
+        code = self._op_index.get(operation)
+        if code is None:
+            return []
+        return [i for i in slots if self._op_codes[i] == code]
+
+    def last(self, n: int = 10) -> List[HistoryEntry]:
+        """The n most recent calls, oldest first"""
+        with self._lock:
+            slots = self._slots()
+            return [self._entry(i) for i in slots[max(len(slots) - n, 0):]]
+
+    def by_operation(self, operation: str, n: Optional[int] = None) -> List[HistoryEntry]:
+        """Recorded calls of one operation (the n most recent, if given), oldest first"""
+        with self._lock:
+            slots = self._matching(operation)
+            if n is not None:
+                slots = slots[max(len(slots) - n, 0):]
+            return [self._entry(i) for i in slots]
+
+    def operations(self) -> Dict[str, int]:
+        """Number of retained calls per operation"""
+        with self._lock:
+            counts = {}
+            for i in self._slots():
+                name = self._operations[self._op_codes[i]]
+                counts[name] = counts.get(name, 0) + 1
+            return counts
+
+    def latency_stats(self, operation: Optional[str] = None) -> Dict[str, Any]:
+        """Count, mean, min, max, p50 and p95 latency (seconds) of retained calls"""
+        with self._lock:
+            latencies = sorted(self._latencies[i] for i in self._matching(operation))
+
+        n = len(latencies)
+        if n == 0:
+            return {"count": 0}
+
+        def percentile(q):
+            return latencies[min(int(q * n), n - 1)]
+
+        return {
+            "count": n,
+            "total": sum(latencies),
+            "mean": sum(latencies) / n,
+            "min": latencies[0],
+            "max": latencies[-1],
+            "p50": percentile(0.50),
+            "p95": percentile(0.95)
+        }
+
+    def clear(self) -> None:
+        """Forget every entry (the buffers stay allocated)"""
+        with self._lock:
+            self._counter = itertools.count()
+            self.total_recorded = 0
@@ -13,20 +13,37 @@ This file shows users that Claude Skills can:
 4. Process data programmatically
 """
 
+import base64
+import csv
 import json
+import os
 import sys
 import math
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+import tempfile
+import time
+from functools import lru_cache, wraps
+from itertools import islice
+from typing import Dict, Iterator, List, Any, NamedTuple, Optional, Sequence
 from enum import Enum
 
-# For visualization (if needed)
-try:
-    import matplotlib.pyplot as plt
-    import numpy as np
-    PLOTTING_AVAILABLE = True
-except ImportError:
-    PLOTTING_AVAILABLE = False
+from calculation_history import CalculationHistory
+from expression_compiler import default_compiler, normalize_expression
+from memo_cache import MISSING, MemoCache
+from graph_rendering import render_fan_chart, render_function_graph
+from graph_sampling import adaptive_sample, decimate, robust_limits, uniform_sample
+from monte_carlo import simulate_growth
+from optional_deps import MATPLOTLIB_AVAILABLE, NUMPY_AVAILABLE, np
+from render_cache import RenderCache
+from svg_plot import HEIGHT as SVG_HEIGHT, WIDTH as SVG_WIDTH, render_svg
+from streaming_stats import (
+    StatisticsAccumulator,
+    file_statistics,
+    rolling_window_arrays,
+)
+
+# numpy (vectorized paths) and matplotlib (visualization) are optional and
+# only imported when a feature that needs them runs; see optional_deps.py
+PLOTTING_AVAILABLE = NUMPY_AVAILABLE and MATPLOTLIB_AVAILABLE
 
 
 class CalculatorType(Enum):
@@ -39,14 +56,327 @@ class CalculatorType(Enum):
     GRAPHING = "graphing"
 
 
-@dataclass
+class FrozenDict(dict):
+    """
+    Read-only dict for metadata and results shared between callers
+    Still a dict, so it serializes to JSON and pickles like one
+    """
+    
+    def __init__(self, *args, **kwargs):
+        if self:
+            raise TypeError("Shared result data is read-only")  # Re-running __init__
+        dict.__init__(self, *args, **kwargs)
+    
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Shared result data is read-only")
+    
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+@lru_cache(maxsize=None)
+def _interned_metadata(items: tuple) -> FrozenDict:
+    return FrozenDict(items)
+
+
+def interned_metadata(**items) -> FrozenDict:
+    """
+    One shared metadata dict per distinct set of items
+    For constant metadata like {"type": "basic", "operation": "add"}
+    """
+    return _interned_metadata(tuple(items.items()))
+
+
 class CalculationResult:
-    """Structure for returning calculation results"""
-    result: Any
-    formula_used: str
-    steps: List[str]
-    visualization_path: Optional[str] = None
-    metadata: Dict[str, Any] = None
+    """
+    Structure for returning calculation results
+    Uses __slots__ (no per-instance __dict__) since batch jobs keep millions of
+    these. Empty steps are not stored, and steps may be passed as a zero-argument
+    callable that builds the list on first access
+    """
+    __slots__ = ("result", "formula_used", "_steps", "visualization_path", "metadata")
+    
+    def __init__(self, result: Any, formula_used: str, steps=None,
+                 visualization_path: Optional[str] = None,
+                 metadata: Optional[Dict[str, Any]] = None):
+        self.result = result
+        self.formula_used = formula_used
+        self._steps = steps or None
+        self.visualization_path = visualization_path
+        self.metadata = metadata
+    
+    @property
+    def steps(self) -> List[str]:
+        steps = self._steps
+        if steps is None:
+            steps = self._steps = []
+        elif callable(steps):
+            steps = self._steps = steps()
+        return steps
+    
+    @steps.setter
+    def steps(self, steps) -> None:
+        self._steps = steps or None
+    
+    def _fields(self) -> tuple:
+        return (self.result, self.formula_used, self.steps,
+                self.visualization_path, self.metadata)
+    
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._fields() == other._fields()
+    
+    def __repr__(self) -> str:
+        return (f"CalculationResult(result={self.result!r}, "
+                f"formula_used={self.formula_used!r}, steps={self.steps!r}, "
+                f"visualization_path={self.visualization_path!r}, "
+                f"metadata={self.metadata!r})")
+    
+    def __getstate__(self):
+        return self._fields()
+    
+    def __setstate__(self, state) -> None:
+        (self.result, self.formula_used, self._steps,
+         self.visualization_path, self.metadata) = state
+
+
+class FrozenCalculationResult(CalculationResult):
+    """
+    CalculationResult that can't be modified, for results shared by a memo cache
+    steps is a tuple and result/metadata dicts are FrozenDicts
+    """
+    __slots__ = ()
+    
+    def __init__(self, result: Any, formula_used: str, steps=None,
+                 visualization_path: Optional[str] = None,
+                 metadata: Optional[Dict[str, Any]] = None):
+        self.__setstate__((result, formula_used, steps, visualization_path, metadata))
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("Cached calculation results are read-only")
+    
+    def __setstate__(self, state) -> None:
+        result, formula_used, steps, visualization_path, metadata = state
+        if isinstance(result, dict):
+            result = FrozenDict(result)
+        if isinstance(metadata, dict) and not isinstance(metadata, FrozenDict):
+            metadata = FrozenDict(metadata)
+        for name, value in (("result", result), ("formula_used", formula_used),
+                            ("_steps", tuple(steps or ())),
+                            ("visualization_path", visualization_path),
+                            ("metadata", metadata)):
+            object.__setattr__(self, name, value)
+
+
+def freeze_result(outcome: CalculationResult) -> FrozenCalculationResult:
+    """Read-only copy of a result (returned as-is if already frozen)"""
+    if isinstance(outcome, FrozenCalculationResult):
+        return outcome
+    return FrozenCalculationResult(outcome.result, outcome.formula_used, outcome.steps,
+                                   outcome.visualization_path, outcome.metadata)
+
+
+# Largest n whose factorial still fits in a float64
+MAX_FLOAT_FACTORIAL = 170
+
+
+@lru_cache(maxsize=1)
+def _factorial_table():
+    """Precomputed float64 factorials for 0..MAX_FLOAT_FACTORIAL"""
+    return np.array([float(math.factorial(n)) for n in range(MAX_FLOAT_FACTORIAL + 1)])
+
+
+def _factorial_array(values):
+    """
+    Vectorized factorial for non-negative integer arrays
+    Inputs up to MAX_FLOAT_FACTORIAL come straight from the lookup table
+    """
+    if np.any(values < 0) or np.any(values != np.floor(values)):
+        raise ValueError("Factorial requires non-negative integer")
+    
+    # Anything past the table overflows float64 (exp(lgamma(n + 1)) is inf too),
+    # so those entries are filled with inf instead of being evaluated
+    small = values <= MAX_FLOAT_FACTORIAL
+    result = np.full(values.shape, np.inf)
+    result[small] = _factorial_table()[values[small].astype(np.int64)]
+    return result
+
+
+def _select_quantiles(data, fractions: Sequence[float]) -> List[float]:
+    """
+    Linear-interpolated quantiles using selection instead of a full sort
+    All needed order statistics are found by one numpy.partition call
+    """
+    values = np.array(data, dtype=float).ravel()
+    n = values.size
+    positions = [(n - 1) * q for q in fractions]
+    kth = sorted({int(math.floor(pos)) for pos in positions} |
+                 {int(math.ceil(pos)) for pos in positions})
+    values.partition(kth)
+    
+    quantiles = []
+    for pos in positions:
+        lo, hi = int(math.floor(pos)), int(math.ceil(pos))
+        quantiles.append(float(values[lo] + (values[hi] - values[lo]) * (pos - lo)))
+    return quantiles
+
+
+def _float_exact(data) -> bool:
+    """True when every value is a float or an int that float64 holds exactly"""
+    return all(type(x) is float or (type(x) is int and -2**53 <= x <= 2**53) for x in data)
+
+
+class AmortizationRow(NamedTuple):
+    """One month of a loan's amortization schedule"""
+    month: int
+    payment: float
+    principal: float
+    interest: float
+    balance: float
+
+
+def _payment_array(principal, monthly_rate, num_payments):
+    """
+    Level monthly payment for arrays of loans
+    Zero-rate loans are handled with a mask instead of a Python branch
+    """
+    zero_rate = monthly_rate == 0
+    safe_rate = np.where(zero_rate, 1.0, monthly_rate)
+    growth = (1 + safe_rate) ** num_payments
+    amortized = principal * (safe_rate * growth) / (growth - 1)
+    return np.where(zero_rate, principal / num_payments, amortized)
+
+
+# Float64 elements per block of amortization_schedule_batch() temporaries
+AMORTIZATION_BLOCK_ELEMENTS = 1 << 18
+
+
+# Column names accepted in loan files (first match wins)
+LOAN_COLUMNS = {
+    "principal": ("principal", "amount"),
+    "annual_rate": ("annual_rate", "rate"),
+    "years": ("years", "term")
+}
+
+
+def _iter_loan_chunks(path: str, chunk_size: int):
+    """
+    Stream (principal, annual_rate, years) array chunks from a CSV or .npy file
+    CSV files need a header; .npy files hold an (n x 3) array in that column order
+    """
+    if path.endswith(".npy"):
+        loans = np.load(path, mmap_mode="r")
+        for start in range(0, loans.shape[0], chunk_size):
+            chunk = np.asarray(loans[start:start + chunk_size], dtype=float)
+            yield chunk[:, 0], chunk[:, 1], chunk[:, 2]
+        return
+    
+    with open(path, newline="") as handle:
+        reader = csv.reader(handle)
+        header = [name.strip().lower() for name in next(reader)]
+        indices = []
+        for column, aliases in LOAN_COLUMNS.items():
+            matches = [header.index(alias) for alias in aliases if alias in header]
+            if not matches:
+                raise ValueError(f"Loan file is missing a '{column}' column")
+            indices.append(matches[0])
+        
+        while True:
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                break
+            chunk = np.array([[row[i] for i in indices] for row in rows], dtype=float)
+            yield chunk[:, 0], chunk[:, 1], chunk[:, 2]
+
+
+def _parameters(method) -> tuple:
+    """Positional parameter names (after self) and defaults of a possibly wrapped method"""
+    while hasattr(method, "__wrapped__"):
+        method = method.__wrapped__
+    code = method.__code__
+    names = code.co_varnames[1:code.co_argcount]
+    defaults = dict(zip(names[len(names) - len(method.__defaults__ or ()):],
+                        method.__defaults__ or ()))
+    return names, defaults
+
+
+def _recorded(method):
+    """
+    Record each successful call of an engine method in the engine's history
+    Keyword arguments are recorded in parameter order (defaults filled in)
+    """
+    operation = method.__name__
+    names, defaults = _parameters(method)
+    
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        history = self.history
+        if not history.capacity:
+            return method(self, *args, **kwargs)
+        
+        start = time.perf_counter()
+        outcome = method(self, *args, **kwargs)
+        end = time.perf_counter()
+        try:
+            if kwargs:
+                args = args + tuple(kwargs[name] if name in kwargs else defaults.get(name)
+                                    for name in names[len(args):])
+            history.record(operation, args, outcome.result, start, end)
+        except Exception:
+            pass  # Recording is best-effort and must never fail a finished call
+        return outcome
+    
+    return wrapper
+
+
+def _memoized(method):
+    """
+    Serve repeated calls from the engine's memo cache, when it has one
+    Arguments are normalized (defaults filled in, keywords placed by position)
+    so equivalent calls share one frozen result; their types (and the sign of
+    floats) are part of the key, since 1, 1.0 and True compare equal but give
+    different results, as do 0.0 and -0.0
+    """
+    names, defaults = _parameters(method)
+    
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = self.memo_cache
+        if cache is None:
+            return method(self, *args, **kwargs)
+        
+        try:
+            values = args + tuple(kwargs[name] if name in kwargs else defaults[name]
+                                  for name in names[len(args):])
+            key = (method.__name__, self.explain, self.precision, values,
+                   tuple(math.copysign(1.0, v) if type(v) is float else type(v)
+                         for v in values))
+            outcome = cache.get(key)
+        except (KeyError, TypeError):
+            # Missing/unhashable arguments: let the method report or handle them
+            return method(self, *args, **kwargs)
+        
+        if outcome is MISSING:
+            outcome = freeze_result(method(self, *args, **kwargs))
+            cache.put(key, outcome)
+        return outcome
+    
+    return wrapper
+
+
+def _write_image(stem: str, image_format: str, data: bytes) -> str:
+    """
+    Save a rendered image under a fresh temp-dir name and return its path
+    Unique per call, so concurrent requests never overwrite each other's files
+    """
+    fd, path = tempfile.mkstemp(prefix=f"{stem}_", suffix=f".{image_format}")
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    return path
 
 
 class CalculatorEngine:
@@ -55,85 +385,138 @@ class CalculatorEngine:
     complex Python logic for calculations.
     """
     
-    def __init__(self):
-        """Initialize the calculator engine"""
-        self.history = []
+    def __init__(self, render_cache: Optional[RenderCache] = None, explain: bool = True,
+                 history_size: int = 1000, memo_cache: Optional[MemoCache] = None):
+        """
+        Initialize the calculator engine
+        Pass a RenderCache to serve repeated graph requests from disk.
+        explain=False skips building `steps` and formatted formulas, for
+        machine callers that only read `result`. The last history_size calls
+        are kept in a fixed-size CalculationHistory. With a MemoCache, repeated
+        scalar calls return a shared, read-only result
+        """
+        self.history = CalculationHistory(history_size)
         self.precision = 4
+        self.render_cache = render_cache
+        self.memo_cache = memo_cache
+        self.explain = explain
     
     # ============================================
     # BASIC OPERATIONS
     # ============================================
     
+    @_recorded
+    @_memoized
     def basic_operation(self, a: float, b: float, operation: str) -> CalculationResult:
         """
         Perform basic arithmetic operations
         This shows how skills can provide robust calculation functions
         """
-        steps = []
-        
+        # Narrative templates are only filled in when explain is on
         if operation == "add":
             result = a + b
-            formula = f"{a} + {b} = {result}"
-            steps = [
-                f"Adding {a} and {b}",
-                f"Result: {result}"
-            ]
+            formula = "{a} + {b} = {result}"
+            action = "Adding {a} and {b}"
         
         elif operation == "subtract":
             result = a - b
-            formula = f"{a} - {b} = {result}"
-            steps = [
-                f"Subtracting {b} from {a}",
-                f"Result: {result}"
-            ]
+            formula = "{a} - {b} = {result}"
+            action = "Subtracting {b} from {a}"
         
         elif operation == "multiply":
             result = a * b
-            formula = f"{a} × {b} = {result}"
-            steps = [
-                f"Multiplying {a} by {b}",
-                f"Result: {result}"
-            ]
+            formula = "{a} × {b} = {result}"
+            action = "Multiplying {a} by {b}"
         
         elif operation == "divide":
             if b == 0:
                 raise ValueError("Division by zero is not allowed")
             result = a / b
-            formula = f"{a} ÷ {b} = {result}"
-            steps = [
-                f"Dividing {a} by {b}",
-                f"Result: {result}"
-            ]
+            formula = "{a} ÷ {b} = {result}"
+            action = "Dividing {a} by {b}"
         
         elif operation == "power":
             result = a ** b
-            formula = f"{a}^{b} = {result}"
+            formula = "{a}^{b} = {result}"
+            action = "Raising {a} to the power of {b}"
+        
+        else:
+            raise ValueError(f"Unknown operation: {operation}")
+        
+        if self.explain:
+            formula = formula.format(a=a, b=b, result=result)
             steps = [
-                f"Raising {a} to the power of {b}",
+                action.format(a=a, b=b),
                 f"Result: {result}"
             ]
-        
         else:
-            raise ValueError(f"Unknown operation: {operation}")
+            formula, steps = "", []
         
         return CalculationResult(
             result=round(result, self.precision),
             formula_used=formula,
             steps=steps,
-            metadata={"type": "basic", "operation": operation}
+            metadata=interned_metadata(type="basic", operation=operation)
+        )
+    
+    @_recorded
+    def basic_operation_batch(self, a, b, operation: str,
+                              round_results: bool = True) -> CalculationResult:
+        """
+        Perform one arithmetic operation over whole arrays of operands
+        The operation is dispatched once as a NumPy ufunc instead of once per row
+        (round_results=False leaves rounding to the caller)
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("Batch operations require numpy")
+        
+        operations = {
+            "add": (np.add, "+"),
+            "subtract": (np.subtract, "-"),
+            "multiply": (np.multiply, "×"),
+            "divide": (np.divide, "÷"),
+            "power": (np.power, "^")
+        }
+        
+        if operation not in operations:
+            raise ValueError(f"Unknown operation: {operation}")
+        
+        func, symbol = operations[operation]
+        a = np.asarray(a, dtype=float)
+        b = np.asarray(b, dtype=float)
+        
+        if operation == "divide" and np.any(b == 0):
+            raise ValueError("Division by zero is not allowed")
+        
+        result = func(a, b)
+        if round_results:
+            result = np.round(result, self.precision)
+        
+        steps = []
+        if self.explain:
+            steps = [
+                f"Applying {operation} to {result.size} operand pairs",
+                f"Result shape: {result.shape}"
+            ]
+        
+        return CalculationResult(
+            result=result,
+            formula_used=f"a {symbol} b (element-wise)",
+            steps=steps,
+            metadata={"type": "basic", "operation": operation, "batch_size": int(result.size)}
         )
     
     # ============================================
     # SCIENTIFIC CALCULATIONS
     # ============================================
     
+    @_recorded
+    @_memoized
     def scientific_calculation(self, value: float, function: str) -> CalculationResult:
         """
         Perform scientific calculations
         Demonstrates how skills can include advanced mathematical functions
         """
-        steps = []
-        
         functions = {
             "sin": (math.sin, "sine"),
             "cos": (math.cos, "cosine"),
@@ -156,28 +539,83 @@ class CalculatorEngine:
                 result = func(int(value))
             else:
                 result = func(value)
-            
+        except Exception as e:
+            raise ValueError(f"Error in {function}: {str(e)}")
+        
+        if self.explain:
             formula = f"{function}({value}) = {result}"
             steps = [
                 f"Calculating {name} of {value}",
                 f"Using mathematical function: {function}",
                 f"Result: {result}"
             ]
-            
-        except Exception as e:
-            raise ValueError(f"Error in {function}: {str(e)}")
+        else:
+            formula, steps = "", []
         
         return CalculationResult(
             result=round(result, self.precision) if isinstance(result, float) else result,
             formula_used=formula,
             steps=steps,
-            metadata={"type": "scientific", "function": function}
+            metadata=interned_metadata(type="scientific", function=function)
+        )
+    
+    @_recorded
+    def scientific_calculation_batch(self, values, function: str,
+                                     round_results: bool = True) -> CalculationResult:
+        """
+        Apply a scientific function to a whole array of values
+        Uses the same function names as scientific_calculation, mapped to NumPy ufuncs
+        (round_results=False leaves rounding to the caller)
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("Batch operations require numpy")
+        
+        functions = {
+            "sin": (np.sin, "sine"),
+            "cos": (np.cos, "cosine"),
+            "tan": (np.tan, "tangent"),
+            "log": (np.log10, "log base 10"),
+            "ln": (np.log, "natural log"),
+            "sqrt": (np.sqrt, "square root"),
+            "factorial": (_factorial_array, "factorial")
+        }
+        
+        if function not in functions:
+            raise ValueError(f"Unknown function: {function}")
+        
+        func, name = functions[function]
+        values = np.asarray(values, dtype=float)
+        
+        try:
+            with np.errstate(divide="raise", invalid="raise"):
+                result = func(values)
+        except FloatingPointError as e:
+            raise ValueError(f"Error in {function}: math domain error ({e})")
+        
+        if function != "factorial" and round_results:
+            result = np.round(result, self.precision)
+        
+        steps = []
+        if self.explain:
+            steps = [
+                f"Calculating {name} of {result.size} values",
+                f"Using vectorized function: {function}",
+                f"Result shape: {result.shape}"
+            ]
+        
+        return CalculationResult(
+            result=result,
+            formula_used=f"{function}(x) (element-wise)",
+            steps=steps,
+            metadata={"type": "scientific", "function": function, "batch_size": int(result.size)}
         )
     
     # ============================================
     # FINANCIAL CALCULATIONS
     # ============================================
     
+    @_recorded
+    @_memoized
     def compound_interest(self, principal: float, rate: float, time: float, 
                          compounds_per_year: int = 12) -> CalculationResult:
         """
@@ -193,15 +631,17 @@ class CalculatorEngine:
         interest = amount - principal
         
         formula = f"A = P(1 + r/n)^(nt)"
-        steps = [
-            f"Principal (P): ${principal:,.2f}",
-            f"Annual Rate (r): {rate:.4%}",
-            f"Time (t): {time} years",
-            f"Compounds per year (n): {compounds_per_year}",
-            f"Calculation: {principal} × (1 + {rate}/{compounds_per_year})^({compounds_per_year}×{time})",
-            f"Final Amount: ${amount:,.2f}",
-            f"Interest Earned: ${interest:,.2f}"
-        ]
+        steps = []
+        if self.explain:
+            steps = [
+                f"Principal (P): ${principal:,.2f}",
+                f"Annual Rate (r): {rate:.4%}",
+                f"Time (t): {time} years",
+                f"Compounds per year (n): {compounds_per_year}",
+                f"Calculation: {principal} × (1 + {rate}/{compounds_per_year})^({compounds_per_year}×{time})",
+                f"Final Amount: ${amount:,.2f}",
+                f"Interest Earned: ${interest:,.2f}"
+            ]
         
         return CalculationResult(
             result={"amount": round(amount, 2), "interest": round(interest, 2)},
@@ -214,6 +654,150 @@ class CalculatorEngine:
             }
         )
     
+    @_recorded
+    def compound_interest_grid(self, principal, rate, time, compounds_per_year=12,
+                               continuous: bool = False) -> CalculationResult:
+        """
+        Evaluate compound interest over a grid of scenarios in one vectorized pass
+        Every array argument gets its own axis, in the order principal, rate, time,
+        compounds_per_year (scalars add no axis); continuous=True uses A = Pe^(rt)
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("Batch operations require numpy")
+        
+        inputs = [np.asarray(value, dtype=float)
+                  for value in (principal, rate, time, compounds_per_year)]
+        if continuous:
+            inputs[3] = np.asarray(1.0)
+        
+        # Give each array input its own axis so the result is an outer-product grid
+        grid_axes = sum(1 for value in inputs if value.ndim)
+        axis = 0
+        shaped = []
+        for value in inputs:
+            if value.ndim:
+                shape = [1] * grid_axes
+                shape[axis] = value.size
+                shaped.append(value.reshape(shape))
+                axis += 1
+            else:
+                shaped.append(value)
+        principal, rate, time, compounds = shaped
+        
+        # Convert percentage to decimal if needed
+        rate = np.where(rate > 1, rate / 100, rate)
+        
+        # log1p/expm1 keep small per-period rates accurate for large n
+        if continuous:
+            exponent = rate * time
+            effective = np.expm1(rate)
+        else:
+            exponent = compounds * time * np.log1p(rate / compounds)
+            effective = np.expm1(compounds * np.log1p(rate / compounds))
+        amount = principal * np.exp(exponent)
+        interest = principal * np.expm1(exponent)
+        
+        formula = "A = Pe^(rt)" if continuous else "A = P(1 + r/n)^(nt)"
+        steps = []
+        if self.explain:
+            steps = [
+                f"Scenarios evaluated: {amount.size}",
+                f"Grid shape: {amount.shape}",
+                "Continuous compounding" if continuous else "Discrete compounding"
+            ]
+        
+        return CalculationResult(
+            result={
+                "amount": np.round(amount, 2),
+                "interest": np.round(interest, 2),
+                "effective_rate": effective
+            },
+            formula_used=formula,
+            steps=steps,
+            metadata={
+                "type": "financial",
+                "calculation": "compound_interest",
+                "grid_shape": amount.shape,
+                "continuous": continuous
+            }
+        )
+    
+    @_recorded
+    def monte_carlo_growth(self, principal: float, rate: float, volatility: float,
+                           years: float, periods_per_year: int = 12, paths: int = 10_000,
+                           distribution: str = "lognormal",
+                           percentiles: Sequence[float] = (5, 25, 50, 75, 95),
+                           seed: Optional[int] = None, workers: Optional[int] = None,
+                           plot: bool = False) -> CalculationResult:
+        """
+        Simulate compound growth with random returns instead of a fixed rate
+        Returns percentile bands of the outcome (one per simulated year) and
+        optionally a fan chart
+        """
+        # Convert percentages to decimals if needed, like compound_interest
+        if rate > 1:
+            rate = rate / 100
+        if volatility > 1:
+            volatility = volatility / 100
+        
+        periods = int(round(years * periods_per_year))
+        simulation = simulate_growth(
+            principal,
+            rate / periods_per_year,
+            volatility / math.sqrt(periods_per_year),
+            periods,
+            paths,
+            distribution=distribution,
+            percentiles=percentiles,
+            seed=seed,
+            max_workers=workers,
+            band_stride=periods_per_year
+        )
+        
+        final_bands = {f"p{p:g}": round(float(value), 2)
+                       for p, value in zip(percentiles, simulation["final_percentiles"])}
+        mean_final = float(simulation["final"].mean())
+        
+        steps = []
+        if self.explain:
+            steps = [
+                f"Principal: ${principal:,.2f}",
+                f"Expected annual return: {rate:.2%} ({distribution})",
+                f"Annual volatility: {volatility:.2%}",
+                f"Paths simulated: {paths:,} × {periods} periods",
+                f"Mean final amount: ${mean_final:,.2f}"
+            ]
+            steps += [f"{key} final amount: ${value:,.2f}" for key, value in final_bands.items()]
+        
+        visualization_path = None
+        if plot and PLOTTING_AVAILABLE:
+            visualization_path = self._plot_fan_chart(simulation, periods_per_year)
+            if self.explain:
+                steps.append(f"Saved fan chart to: {visualization_path}")
+        
+        return CalculationResult(
+            result={
+                "mean_amount": round(mean_final, 2),
+                "percentiles": final_bands,
+                "bands": simulation["bands"],
+                "band_periods": simulation["band_periods"]
+            },
+            formula_used="W_t = P·Π(1 + r_i), r_i random",
+            steps=steps,
+            visualization_path=visualization_path,
+            metadata={
+                "type": "financial",
+                "calculation": "monte_carlo_growth",
+                "paths": paths,
+                "periods": periods,
+                "distribution": distribution,
+                "seed": seed,
+                "workers": simulation["workers"]
+            }
+        )
+    
+    @_recorded
+    @_memoized
     def loan_payment(self, principal: float, annual_rate: float, 
                     years: int) -> CalculationResult:
         """
@@ -234,14 +818,16 @@ class CalculatorEngine:
         total_interest = total_paid - principal
         
         formula = "M = P[r(1+r)^n]/[(1+r)^n-1]"
-        steps = [
-            f"Loan Amount: ${principal:,.2f}",
-            f"Annual Rate: {annual_rate}%",
-            f"Loan Term: {years} years ({num_payments} months)",
-            f"Monthly Payment: ${payment:,.2f}",
-            f"Total Amount Paid: ${total_paid:,.2f}",
-            f"Total Interest: ${total_interest:,.2f}"
-        ]
+        steps = []
+        if self.explain:
+            steps = [
+                f"Loan Amount: ${principal:,.2f}",
+                f"Annual Rate: {annual_rate}%",
+                f"Loan Term: {years} years ({num_payments} months)",
+                f"Monthly Payment: ${payment:,.2f}",
+                f"Total Amount Paid: ${total_paid:,.2f}",
+                f"Total Interest: ${total_interest:,.2f}"
+            ]
         
         return CalculationResult(
             result={
@@ -251,13 +837,178 @@ class CalculatorEngine:
             },
             formula_used=formula,
             steps=steps,
-            metadata={"type": "financial", "calculation": "loan_payment"}
+            metadata=interned_metadata(type="financial", calculation="loan_payment")
+        )
+    
+    @_recorded
+    def loan_payment_batch(self, principal, annual_rate, years) -> CalculationResult:
+        """
+        Calculate monthly payments for a whole portfolio in one vectorized pass
+        Inputs are broadcast arrays; zero-rate loans are handled with masks
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("Batch operations require numpy")
+        
+        principal = np.asarray(principal, dtype=float)
+        monthly_rate = np.asarray(annual_rate, dtype=float) / 100 / 12
+        num_payments = np.asarray(years, dtype=float) * 12
+        
+        payment = _payment_array(principal, monthly_rate, num_payments)
+        total_paid = payment * num_payments
+        total_interest = total_paid - principal
+        
+        steps = []
+        if self.explain:
+            steps = [
+                f"Loans priced: {payment.size}",
+                f"Total principal: ${float(np.sum(principal)):,.2f}",
+                f"Total interest: ${float(np.sum(total_interest)):,.2f}"
+            ]
+        
+        return CalculationResult(
+            result={
+                "monthly_payment": np.round(payment, 2),
+                "total_paid": np.round(total_paid, 2),
+                "total_interest": np.round(total_interest, 2)
+            },
+            formula_used="M = P[r(1+r)^n]/[(1+r)^n-1]",
+            steps=steps,
+            metadata={"type": "financial", "calculation": "loan_payment", "batch_size": int(payment.size)}
+        )
+    
+    @_recorded
+    def loan_payment_file(self, input_path: str, output_path: str,
+                          chunk_size: int = 100_000) -> CalculationResult:
+        """
+        Price every loan in a CSV or .npy file, streaming it in chunks
+        Results are written as monthly_payment, total_paid, total_interest columns
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("Batch operations require numpy")
+        
+        columns = ["monthly_payment", "total_paid", "total_interest"]
+        loans = 0
+        with open(output_path, "w", newline="") as out:
+            out.write(",".join(columns) + "\n")
+            for principal, annual_rate, years in _iter_loan_chunks(input_path, chunk_size):
+                priced = self.loan_payment_batch(principal, annual_rate, years).result
+                np.savetxt(out, np.column_stack([priced[c] for c in columns]),
+                           delimiter=",", fmt="%.2f")
+                loans += principal.size
+        
+        steps = []
+        if self.explain:
+            steps = [
+                f"Input: {input_path}",
+                f"Loans priced: {loans}",
+                f"Chunk size: {chunk_size}",
+                f"Output: {output_path}"
+            ]
+        
+        return CalculationResult(
+            result={"loans": loans, "output_path": output_path},
+            formula_used="M = P[r(1+r)^n]/[(1+r)^n-1]",
+            steps=steps,
+            metadata={"type": "financial", "calculation": "loan_payment", "batch_size": loans}
+        )
+    
+    def amortization_schedule(self, principal: float, annual_rate: float,
+                              years: int) -> Iterator[AmortizationRow]:
+        """
+        Lazily generate the month-by-month schedule for one loan
+        Uses the same payment formula as loan_payment
+        """
+        monthly_rate = annual_rate / 100 / 12
+        num_payments = years * 12
+        
+        if monthly_rate == 0:
+            payment = principal / num_payments
+        else:
+            payment = principal * (monthly_rate * (1 + monthly_rate)**num_payments) / \
+                     ((1 + monthly_rate)**num_payments - 1)
+        
+        balance = principal
+        for month in range(1, num_payments + 1):
+            interest = balance * monthly_rate
+            principal_part = payment - interest
+            balance = max(balance - principal_part, 0.0)
+            yield AmortizationRow(
+                month=month,
+                payment=round(payment, 2),
+                principal=round(principal_part, 2),
+                interest=round(interest, 2),
+                balance=round(balance, 2)
+            )
+    
+    @_recorded
+    def amortization_schedule_batch(self, principal, annual_rate, years,
+                                    dtype: str = "float64") -> CalculationResult:
+        """
+        Build columnar schedules for many loans at once
+        Each result column is a (loans x months) array; months past a loan's term are 0
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("Batch operations require numpy")
+        
+        principal, annual_rate, years = np.broadcast_arrays(
+            np.asarray(principal, dtype=float),
+            np.asarray(annual_rate, dtype=float),
+            np.asarray(years, dtype=np.int64)
+        )
+        principal = principal.reshape(-1, 1)
+        monthly_rate = annual_rate.reshape(-1, 1) / 100 / 12
+        num_payments = years.reshape(-1, 1) * 12
+        payment = _payment_array(principal, monthly_rate, num_payments)
+        
+        months = np.arange(1, int(num_payments.max()) + 1)
+        loans = principal.shape[0]
+        columns = ("payment", "principal", "interest", "balance")
+        schedule = {key: np.zeros((loans, months.size), dtype=dtype) for key in columns}
+        
+        # Closed-form balance after k payments, evaluated for every month at once.
+        # Blocks of loans keep the float64 temporaries small; each block is
+        # rounded and cast straight into the preallocated output columns
+        block = max(1, AMORTIZATION_BLOCK_ELEMENTS // months.size)
+        for start in range(0, loans, block):
+            rows = slice(start, start + block)
+            rate, pay, loan = monthly_rate[rows], payment[rows], principal[rows]
+            active = months <= num_payments[rows]
+            growth = (1 + rate) ** (months - 1)
+            safe_rate = np.where(rate == 0, 1.0, rate)
+            opening = np.where(
+                rate == 0,
+                loan - pay * (months - 1),
+                loan * growth - pay * (growth - 1) / safe_rate
+            )
+            interest = opening * rate
+            principal_part = pay - interest
+            balance = np.maximum(opening - principal_part, 0.0)
+            
+            for key, values in zip(columns, (pay, principal_part, interest, balance)):
+                schedule[key][rows] = np.where(active, np.round(values, 2), 0.0)
+        schedule["month"] = months
+        
+        steps = []
+        if self.explain:
+            steps = [
+                f"Loans: {loans}",
+                f"Months per schedule: {months.size}",
+                "Columns: payment, principal, interest, balance"
+            ]
+        
+        return CalculationResult(
+            result=schedule,
+            formula_used="B_k = P(1+r)^k - M[(1+r)^k - 1]/r",
+            steps=steps,
+            metadata={"type": "financial", "calculation": "amortization_schedule",
+                      "loans": loans, "months": int(months.size)}
         )
     
     # ============================================
     # STATISTICAL CALCULATIONS
     # ============================================
     
+    @_recorded
     def statistics(self, data: List[float]) -> CalculationResult:
         """
         Calculate statistical measures
@@ -269,12 +1020,22 @@ class CalculatorEngine:
         n = len(data)
         mean = sum(data) / n
         
-        # Calculate median
-        sorted_data = sorted(data)
-        if n % 2 == 0:
-            median = (sorted_data[n//2 - 1] + sorted_data[n//2]) / 2
+        # Calculate median (selection is O(n) when every value is exact as a
+        # float64; otherwise, or without numpy, fall back to sorting)
+        if NUMPY_AVAILABLE and _float_exact(data):
+            # Partition a float copy, but take the middle element(s) from data
+            # itself so the median keeps the input's types
+            order = np.argpartition(np.array(data, dtype=float), sorted({(n - 1) // 2, n // 2}))
+            if n % 2 == 0:
+                median = (data[order[n//2 - 1]] + data[order[n//2]]) / 2
+            else:
+                median = data[order[n//2]]
         else:
-            median = sorted_data[n//2]
+            sorted_data = sorted(data)
+            if n % 2 == 0:
+                median = (sorted_data[n//2 - 1] + sorted_data[n//2]) / 2
+            else:
+                median = sorted_data[n//2]
         
         # Calculate mode (most frequent value)
         from collections import Counter
@@ -289,17 +1050,19 @@ class CalculatorEngine:
         # Calculate range
         data_range = max(data) - min(data)
         
-        steps = [
-            f"Data points: {n}",
-            f"Mean: {mean:.4f}",
-            f"Median: {median:.4f}",
-            f"Mode: {mode:.4f}" if mode else "Mode: No unique mode",
-            f"Standard Deviation: {std_dev:.4f}",
-            f"Variance: {variance:.4f}",
-            f"Range: {data_range:.4f}",
-            f"Min: {min(data):.4f}",
-            f"Max: {max(data):.4f}"
-        ]
+        steps = []
+        if self.explain:
+            steps = [
+                f"Data points: {n}",
+                f"Mean: {mean:.4f}",
+                f"Median: {median:.4f}",
+                f"Mode: {mode:.4f}" if mode else "Mode: No unique mode",
+                f"Standard Deviation: {std_dev:.4f}",
+                f"Variance: {variance:.4f}",
+                f"Range: {data_range:.4f}",
+                f"Min: {min(data):.4f}",
+                f"Max: {max(data):.4f}"
+            ]
         
         return CalculationResult(
             result={
@@ -318,16 +1081,167 @@ class CalculatorEngine:
             metadata={"type": "statistical", "data_points": n}
         )
     
+    @_recorded
+    def quantiles(self, data, percentiles: Sequence[float] = (50, 90, 99)) -> CalculationResult:
+        """
+        Calculate the median, chosen percentiles and the IQR in one call
+        Uses selection (numpy.partition) rather than sorting the whole data set
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("Quantile calculations require numpy")
+        if len(data) == 0:
+            raise ValueError("Data list cannot be empty")
+        for p in percentiles:
+            if not 0 <= p <= 100:
+                raise ValueError(f"Percentile out of range: {p}")
+        
+        fractions = [0.5, 0.25, 0.75] + [p / 100 for p in percentiles]
+        median, q1, q3, *values = _select_quantiles(data, fractions)
+        
+        result = {"median": median}
+        for p, value in zip(percentiles, values):
+            result[f"p{p:g}"] = value
+        result["q1"] = q1
+        result["q3"] = q3
+        result["iqr"] = q3 - q1
+        
+        steps = []
+        if self.explain:
+            steps = [f"Data points: {len(data)}"]
+            steps += [f"{key}: {value:.4f}" for key, value in result.items()]
+        
+        return CalculationResult(
+            result={key: round(value, 4) for key, value in result.items()},
+            formula_used="Linear-interpolated quantiles via selection",
+            steps=steps,
+            metadata={"type": "statistical", "calculation": "quantiles", "data_points": len(data)}
+        )
+    
+    @_recorded
+    def streaming_statistics(self, stream, sketch: bool = False, compression: float = 100,
+                             heavy_hitters: int = 64) -> CalculationResult:
+        """
+        Calculate statistical measures in a single pass over a stream
+        Accepts an iterable of numbers (or chunks) or a filled StatisticsAccumulator;
+        sketch=True adds an approximate median and mode in bounded memory
+        """
+        if isinstance(stream, StatisticsAccumulator):
+            acc = stream
+        else:
+            acc = StatisticsAccumulator(sketch, compression, heavy_hitters)
+            for item in stream:
+                if isinstance(item, (int, float)):
+                    acc.push(item)
+                else:
+                    acc.push_many(item)
+        
+        return self._accumulator_result(acc, "Streaming Statistical Analysis")
+    
+    @_recorded
+    def statistics_from_file(self, path: str, dtype: str = "float64",
+                             workers: Optional[int] = None, sketch: bool = False,
+                             compression: float = 100,
+                             heavy_hitters: int = 64) -> CalculationResult:
+        """
+        Calculate statistical measures over a large binary float file
+        The file is memory-mapped and reduced in chunks across all cores
+        """
+        sketch_options = None
+        if sketch:
+            sketch_options = {"compression": compression, "heavy_hitters": heavy_hitters}
+        
+        acc = file_statistics(path, dtype=dtype, max_workers=workers,
+                              sketch_options=sketch_options)
+        return self._accumulator_result(
+            acc,
+            "Memory-Mapped Statistical Analysis",
+            source=path,
+            dtype=dtype
+        )
+    
+    @_recorded
+    def rolling_statistics(self, data, window: int) -> CalculationResult:
+        """
+        Calculate rolling mean, std, min and max for every full window of data
+        Use RollingStatistics directly for live, sample-by-sample updates
+        """
+        rolling = rolling_window_arrays(data, window)
+        windows = rolling["mean"].size
+        
+        steps = []
+        if self.explain:
+            steps = [
+                f"Data points: {len(data)}",
+                f"Window size: {window}",
+                f"Windows computed: {windows}",
+                f"Latest mean: {rolling['mean'][-1]:.4f}",
+                f"Latest std dev: {rolling['std_dev'][-1]:.4f}"
+            ]
+        
+        return CalculationResult(
+            result={key: np.round(values, self.precision) for key, values in rolling.items()},
+            formula_used=f"Rolling statistics over a {window}-sample window",
+            steps=steps,
+            metadata={"type": "statistical", "calculation": "rolling", "window": window,
+                      "windows": windows}
+        )
+    
+    def _accumulator_result(self, acc: StatisticsAccumulator, formula: str,
+                            **metadata) -> CalculationResult:
+        """Wrap an accumulator summary in the same shape statistics() returns"""
+        stats = acc.result()
+        
+        steps = []
+        if self.explain:
+            steps = [
+                f"Data points: {stats['count']}",
+                f"Mean: {stats['mean']:.4f}"
+            ]
+            if stats["median"] is not None:
+                steps.append(f"Median (approx.): {stats['median']:.4f}")
+                steps.append(f"Mode (approx.): {stats['mode']:.4f}" if stats["mode"] is not None
+                             else "Mode (approx.): No value stands out")
+            steps += [
+                f"Standard Deviation: {stats['std_dev']:.4f}",
+                f"Variance: {stats['variance']:.4f}",
+                f"Range: {stats['range']:.4f}",
+                f"Min: {stats['min']:.4f}",
+                f"Max: {stats['max']:.4f}"
+            ]
+        
+        error_bounds = acc.error_bounds()
+        if error_bounds:
+            metadata["error_bounds"] = error_bounds
+        
+        return CalculationResult(
+            result={key: round(value, 4) if isinstance(value, float) else value
+                    for key, value in stats.items()},
+            formula_used=formula,
+            steps=steps,
+            metadata={"type": "statistical", "data_points": stats["count"], **metadata}
+        )
+    
     # ============================================
     # VISUALIZATION (IF AVAILABLE)
     # ============================================
     
-    def create_function_graph(self, function_str: str, x_range: tuple = (-10, 10)) -> CalculationResult:
+    @_recorded
+    def create_function_graph(self, function_str: str, x_range: tuple = (-10, 10),
+                              sampling: str = "adaptive", max_points: int = 1000,
+                              backend: str = "svg", image_format: str = "png",
+                              output: str = "file", target_points: int = 2000,
+                              decimation: str = "lttb", dpi: int = 100) -> CalculationResult:
         """
         Create a graph of a mathematical function
-        Demonstrates how skills can generate visualizations
+        Demonstrates how skills can generate visualizations; "adaptive" sampling
+        spends points on curved or discontinuous regions, "uniform" uses a fixed grid.
+        Curves with more than target_points samples are decimated before rendering.
+        The default "svg" backend writes SVG without matplotlib; backend="matplotlib"
+        renders PNG or SVG (image_format). output="bytes" returns the image in
+        `result` without touching disk. With a render cache, repeated requests
+        skip evaluation and rendering entirely
         """
-        if not PLOTTING_AVAILABLE:
+        if not NUMPY_AVAILABLE or (backend == "matplotlib" and not PLOTTING_AVAILABLE):
             return CalculationResult(
                 result="Visualization libraries not available",
                 formula_used=function_str,
@@ -336,53 +1250,64 @@ class CalculatorEngine:
             )
         
         try:
-            # Create x values
-            x = np.linspace(x_range[0], x_range[1], 1000)
-            
-            # Evaluate function (safely)
-            # In production, you'd want more robust parsing
-            allowed_names = {
-                'x': x,
-                'sin': np.sin,
-                'cos': np.cos,
-                'tan': np.tan,
-                'exp': np.exp,
-                'log': np.log,
-                'sqrt': np.sqrt,
-                'pi': math.pi,
-                'e': math.e
-            }
-            
-            y = eval(function_str, {"__builtins__": {}}, allowed_names)
+            # Look up the finished image first: the key covers everything that
+            # changes its pixels (the title shows the normalized expression, so
+            # spellings that share a key also share an image)
+            expression = normalize_expression(function_str)
+            cache_key = None
+            if self.render_cache is not None:
+                image_format = "svg" if backend == "svg" else image_format
+                cache_key = RenderCache.make_key(
+                    expression=expression,
+                    x_range=[float(v) for v in x_range],
+                    sampling=sampling,
+                    max_points=max_points,
+                    target_points=target_points,
+                    decimation=decimation,
+                    backend=backend,
+                    format=image_format,
+                    size=(SVG_WIDTH, SVG_HEIGHT) if backend == "svg" else (10, 6),
+                    dpi=dpi
+                )
+                cached_path = self.render_cache.get(cache_key, image_format)
+                if cached_path:
+                    return self._cached_graph_result(function_str, x_range, cached_path,
+                                                     backend, image_format, output)
             
-            # Create plot
-            plt.figure(figsize=(10, 6))
-            plt.plot(x, y, 'b-', linewidth=2)
-            plt.grid(True, alpha=0.3)
-            plt.xlabel('x')
-            plt.ylabel('f(x)')
-            plt.title(f'Graph of f(x) = {function_str}')
-            plt.axhline(y=0, color='k', linewidth=0.5)
-            plt.axvline(x=0, color='k', linewidth=0.5)
+            # Evaluate function (parsed, whitelisted and cached by the compiler)
+            func = default_compiler.compile(function_str)
             
-            # Save plot
-            output_path = '/tmp/function_graph.png'
-            plt.savefig(output_path, dpi=100, bbox_inches='tight')
-            plt.close()
+            # Choose x values and evaluate
+            if sampling == "adaptive":
+                x, y = adaptive_sample(func, x_range[0], x_range[1], max_points=max_points)
+            elif sampling == "uniform":
+                x, y = uniform_sample(func, x_range[0], x_range[1], points=max_points)
+            else:
+                raise ValueError(f"Unknown sampling mode: {sampling}")
             
-            steps = [
-                f"Function: f(x) = {function_str}",
-                f"X range: {x_range[0]} to {x_range[1]}",
-                "Generated graph successfully",
-                f"Saved to: {output_path}"
-            ]
+            steps = []
+            if self.explain:
+                steps = [
+                    f"Function: f(x) = {function_str}",
+                    f"X range: {x_range[0]} to {x_range[1]}",
+                    f"Sampled {x.size} points ({sampling})"
+                ]
+            metadata = {
+                "type": "graphing",
+                "x_range": x_range,
+                "sampling": sampling,
+                "expression_cache": default_compiler.cache_info()
+            }
             
-            return CalculationResult(
-                result="Graph created successfully",
-                formula_used=f"f(x) = {function_str}",
-                steps=steps,
-                visualization_path=output_path,
-                metadata={"type": "graphing", "x_range": x_range}
+            return self._render_graph(
+                x, y,
+                f'Graph of f(x) = {expression}',
+                f"f(x) = {function_str}",
+                steps, metadata,
+                backend=backend, image_format=image_format, output=output,
+                output_stem="function_graph",
+                target_points=target_points, decimation=decimation,
+                dpi=dpi, cache_key=cache_key
             )
             
         except Exception as e:
@@ -392,17 +1317,490 @@ class CalculatorEngine:
                 steps=[f"Error: {str(e)}"],
                 metadata={"type": "graphing", "error": str(e)}
             )
+    
+    @_recorded
+    def plot_series(self, data, x=None, title: str = "Data Series",
+                    target_points: int = 2000, decimation: str = "lttb",
+                    backend: str = "svg", image_format: str = "png",
+                    output: str = "file") -> CalculationResult:
+        """
+        Plot a raw data series (e.g. the list passed to statistics())
+        Millions of points are decimated to target_points before rendering
+        """
+        if not NUMPY_AVAILABLE or (backend == "matplotlib" and not PLOTTING_AVAILABLE):
+            return CalculationResult(
+                result="Visualization libraries not available",
+                formula_used=title,
+                steps=["Plotting libraries (matplotlib) not installed"],
+                metadata={"type": "graphing", "error": "libraries_missing"}
+            )
+        
+        y = np.asarray(data, dtype=float).ravel()
+        if y.size == 0:
+            raise ValueError("Data list cannot be empty")
+        x_label = "index" if x is None else "x"
+        x = np.arange(y.size, dtype=float) if x is None else np.asarray(x, dtype=float).ravel()
+        
+        return self._render_graph(
+            x, y, title, title,
+            [f"Data points: {y.size}"] if self.explain else [],
+            {"type": "graphing", "data_points": int(y.size)},
+            backend=backend, image_format=image_format, output=output,
+            output_stem="data_series",
+            target_points=target_points, decimation=decimation,
+            labels=(x_label, "value")
+        )
+    
+    def _render_graph(self, x, y, title: str, formula: str, steps: List[str],
+                      metadata: Dict[str, Any], backend: str, image_format: str,
+                      output: str, output_stem: str, target_points: int,
+                      decimation: str, labels: tuple = ("x", "f(x)"), dpi: int = 100,
+                      cache_key: Optional[str] = None) -> CalculationResult:
+        """Decimate, render and deliver (file or bytes) one curve"""
+        sampled = int(x.size)
+        if x.size > target_points:
+            x, y = decimate(x, y, target_points, decimation)
+            if self.explain:
+                steps.append(f"Decimated {sampled:,} → {x.size:,} points ({decimation})")
+            metadata["decimation"] = decimation
+        
+        if backend == "svg":
+            image_format = "svg"
+            image = render_svg(x, y, title, y_limits=robust_limits(y),
+                               x_label=labels[0], y_label=labels[1])
+        elif backend == "matplotlib":
+            # Render on a pooled Agg figure (no pyplot global state)
+            image = render_function_graph(
+                x, y,
+                title,
+                image_format=image_format,
+                dpi=dpi,
+                y_limits=robust_limits(y),
+                x_label=labels[0],
+                y_label=labels[1]
+            )
+        else:
+            raise ValueError(f"Unknown graph backend: {backend}")
+        
+        if self.explain:
+            steps.append("Generated graph successfully")
+        metadata.update({
+            "points": sampled,
+            "rendered_points": int(x.size),
+            "backend": backend,
+            "format": image_format,
+            "bytes": len(image)
+        })
+        
+        cached_path = None
+        if cache_key is not None:
+            cached_path = self.render_cache.put(cache_key, image_format, image)
+            metadata["cache"] = "miss"
+            metadata["render_cache"] = self.render_cache.stats()
+        
+        if output == "bytes":
+            if self.explain:
+                steps.append(f"Rendered {len(image):,} bytes of {image_format.upper()} in memory")
+            return CalculationResult(
+                result=image,
+                formula_used=formula,
+                steps=steps,
+                metadata=metadata
+            )
+        if output != "file":
+            raise ValueError(f"Unknown output mode: {output}")
+        
+        # Save plot (a cached render already lives in its own file)
+        if cached_path:
+            output_path = cached_path
+        else:
+            output_path = _write_image(output_stem, image_format, image)
+        if self.explain:
+            steps.append(f"Saved to: {output_path}")
+        
+        return CalculationResult(
+            result="Graph created successfully",
+            formula_used=formula,
+            steps=steps,
+            visualization_path=output_path,
+            metadata=metadata
+        )
+    
+    def _cached_graph_result(self, function_str: str, x_range: tuple, path: str,
+                             backend: str, image_format: str, output: str) -> CalculationResult:
+        """Build a graph result straight from a render-cache hit"""
+        steps = []
+        if self.explain:
+            steps = [
+                f"Function: f(x) = {function_str}",
+                f"X range: {x_range[0]} to {x_range[1]}",
+                "Served from render cache"
+            ]
+        metadata = {
+            "type": "graphing",
+            "x_range": x_range,
+            "backend": backend,
+            "format": image_format,
+            "cache": "hit",
+            "render_cache": self.render_cache.stats()
+        }
+        
+        if output == "bytes":
+            with open(path, 'rb') as f:
+                image = f.read()
+            metadata["bytes"] = len(image)
+            return CalculationResult(
+                result=image,
+                formula_used=f"f(x) = {function_str}",
+                steps=steps,
+                metadata=metadata
+            )
+        if output != "file":
+            raise ValueError(f"Unknown output mode: {output}")
+        
+        if self.explain:
+            steps.append(f"Saved to: {path}")
+        return CalculationResult(
+            result="Graph created successfully",
+            formula_used=f"f(x) = {function_str}",
+            steps=steps,
+            visualization_path=path,
+            metadata=metadata
+        )
+    
+    def _plot_fan_chart(self, simulation: Dict[str, Any], periods_per_year: int) -> str:
+        """Draw Monte Carlo percentile bands as a fan chart and return its path"""
+        years = np.concatenate(([0], simulation["band_periods"] / periods_per_year))
+        bands = np.column_stack([np.full(len(simulation["bands"]), simulation["principal"]),
+                                 simulation["bands"]])
+        image = render_fan_chart(years, bands, simulation["percentiles"],
+                                 'Monte Carlo Growth Projection')
+        return _write_image("monte_carlo_fan", "png", image)
 
 
 # ============================================
 # COMMAND-LINE INTERFACE
 # ============================================
 
+def json_default(obj):
+    """Convert NumPy arrays/scalars and image bytes so results can be printed as JSON"""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if isinstance(obj, bytes):
+        return base64.b64encode(obj).decode("ascii")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def run_request(calc: CalculatorEngine, data: Dict[str, Any]) -> CalculationResult:
+    """
+    Run one request in the `json` command's schema
+    List operands go to the vectorized batch methods
+    """
+    if data["type"] == "basic" and isinstance(data["a"], list):
+        return calc.basic_operation_batch(
+            data["a"],
+            data["b"],
+            data["operation"]
+        )
+    elif data["type"] == "basic":
+        return calc.basic_operation(
+            data["a"], 
+            data["b"], 
+            data["operation"]
+        )
+    elif data["type"] == "scientific":
+        return calc.scientific_calculation(
+            data["value"],
+            data["function"]
+        )
+    elif data["type"] == "financial":
+        if data["calculation"] == "compound_interest":
+            return calc.compound_interest(
+                data["principal"],
+                data["rate"],
+                data["time"],
+                data.get("compounds_per_year", 12)
+            )
+        elif data["calculation"] == "loan_payment" and isinstance(data["principal"], list):
+            return calc.loan_payment_batch(
+                data["principal"],
+                data["rate"],
+                data["years"]
+            )
+        elif data["calculation"] == "loan_payment":
+            return calc.loan_payment(
+                data["principal"],
+                data["rate"],
+                data["years"]
+            )
+        elif data["calculation"] == "monte_carlo_growth":
+            return calc.monte_carlo_growth(
+                data["principal"],
+                data["rate"],
+                data["volatility"],
+                data["years"],
+                paths=data.get("paths", 10_000),
+                seed=data.get("seed")
+            )
+        raise ValueError(f"Unknown financial calculation: {data['calculation']}")
+    elif data["type"] == "statistical" and "percentiles" in data:
+        return calc.quantiles(data["data"], data["percentiles"])
+    elif data["type"] == "statistical":
+        return calc.statistics(data["data"])
+    elif data["type"] == "graphing":
+        return calc.create_function_graph(
+            data["function"],
+            tuple(data.get("x_range", (-10, 10))),
+            output=data.get("output", "file")
+        )
+    raise ValueError(f"Unknown request type: {data['type']}")
+
+
+def result_payload(result: CalculationResult) -> Dict[str, Any]:
+    """The JSON object printed for a result"""
+    return {
+        "result": result.result,
+        "formula": result.formula_used,
+        "steps": result.steps,
+        "metadata": result.metadata
+    }
+
+
+def error_payload(error: Exception) -> Dict[str, Any]:
+    """The JSON object printed for a request that failed"""
+    if isinstance(error, KeyError):
+        return {"error": f"Missing field: {error.args[0]}"}
+    return {"error": str(error) or type(error).__name__}
+
+
+# Where long-running servers keep graphs requested with output="file"
+SERVER_RENDER_DIR = os.path.join(tempfile.gettempdir(), "calculator_engine_renders")
+
+
+def serving_engines(cache_size: int = 4096,
+                    history_size: int = 1000) -> Dict[bool, CalculatorEngine]:
+    """
+    An explained and a fast-mode engine for long-running servers, keyed by
+    the request's "explain" flag; both share one memo cache (0 disables it)
+    and keep history_size calls of history each (0 disables recording).
+    Graph files go to a size-capped render cache instead of a fresh temp
+    file per request, so disk use stays bounded however long they serve
+    """
+    memo = MemoCache(cache_size) if cache_size else None
+    renders = RenderCache(SERVER_RENDER_DIR)
+    return {
+        True: CalculatorEngine(render_cache=renders, memo_cache=memo,
+                               history_size=history_size),
+        False: CalculatorEngine(render_cache=renders, explain=False, memo_cache=memo,
+                                history_size=history_size)
+    }
+
+
+def answer_request(data: Any, engines: Dict[bool, CalculatorEngine]) -> Dict[str, Any]:
+    """
+    Result or error payload for one decoded request (never raises)
+    An "id" field, if present, is echoed back
+    """
+    request_id = None
+    try:
+        if not isinstance(data, dict):
+            raise ValueError("Request must be a JSON object")
+        request_id = data.get("id")
+        payload = result_payload(run_request(engines[bool(data.get("explain", True))], data))
+    except Exception as e:
+        payload = error_payload(e)
+    if request_id is not None:
+        payload["id"] = request_id
+    return payload
+
+
+def encode_payload(payload: Dict[str, Any]) -> str:
+    """One compact JSON line"""
+    return json.dumps(payload, separators=(",", ":"), default=json_default)
+
+
+def handle_request_line(line: bytes, engines: Dict[bool, CalculatorEngine]) -> str:
+    """Answer one NDJSON request line with one JSON line (never raises)"""
+    try:
+        data = json.loads(line)
+    except ValueError as e:
+        return encode_payload(error_payload(e))
+    return encode_payload(answer_request(data, engines))
+
+
+def serve_stdio(batch_size: int = 1, cache_size: int = 4096, history_size: int = 1000,
+                stdin=None, stdout=None) -> int:
+    """
+    Serve newline-delimited JSON requests until stdin closes
+    Output is flushed every batch_size responses, and always before waiting
+    for more input, so a client that sends one request at a time never stalls.
+    Returns the number of requests answered
+    """
+    stdin = stdin if stdin is not None else sys.stdin.buffer
+    stdout = stdout if stdout is not None else sys.stdout
+    engines = serving_engines(cache_size, history_size)
+    
+    read = getattr(stdin, "read1", stdin.read)
+    pending: List[str] = []
+    buffered = b""
+    answered = 0
+    
+    while True:
+        chunk = read(65536)
+        if not chunk:
+            break
+        *lines, buffered = (buffered + chunk).split(b"\n")
+        for line in lines:
+            if not line.strip():
+                continue
+            pending.append(handle_request_line(line, engines))
+            answered += 1
+            if len(pending) >= batch_size:
+                stdout.write("\n".join(pending) + "\n")
+                stdout.flush()
+                pending.clear()
+        # About to block on the next read: send everything answered so far
+        if pending:
+            stdout.write("\n".join(pending) + "\n")
+            stdout.flush()
+            pending.clear()
+    
+    if buffered.strip():
+        stdout.write(handle_request_line(buffered, engines) + "\n")
+        answered += 1
+    stdout.flush()
+    return answered
+
+
+# Engines of a batch worker process, created once by _init_batch_worker
+_batch_engines: Optional[Dict[bool, CalculatorEngine]] = None
+
+
+def _init_batch_worker(cache_size: int, history_size: int) -> None:
+    global _batch_engines
+    _batch_engines = serving_engines(cache_size, history_size)
+
+
+def _run_batch_chunk(chunk: List[tuple]) -> List[tuple]:
+    """(index, request) pairs -> (index, JSON line, failed) triples"""
+    results = []
+    for index, data in chunk:
+        payload = answer_request(data, _batch_engines)
+        results.append((index, encode_payload(payload), "error" in payload))
+    return results
+
+
+def run_batch_file(input_path: str, output_path: str, workers: Optional[int] = None,
+                   chunk_size: int = 2000, cache_size: int = 4096,
+                   history_size: int = 0, progress=None) -> Dict[str, Any]:
+    """
+    Answer every NDJSON request in a file, writing results in input order
+    Requests are grouped by type and the groups are cut into chunks that run
+    across a process pool; a bad record only produces an error line.
+    Progress and throughput go to `progress` (stderr by default). Worker
+    engines keep no call history unless history_size is set
+    """
+    progress = progress if progress is not None else sys.stderr
+    start = time.perf_counter()
+    
+    results: List[Optional[str]] = []
+    groups: Dict[str, list] = {}
+    errors = 0
+    with open(input_path, "rb") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            index = len(results)
+            results.append(None)
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                results[index] = encode_payload({"error": f"Invalid JSON: {e}"})
+                errors += 1
+                continue
+            kind = data.get("type") if isinstance(data, dict) else None
+            groups.setdefault(str(kind), []).append((index, data))
+    
+    total = len(results)
+    chunks = [requests[i:i + chunk_size]
+              for requests in groups.values()
+              for i in range(0, len(requests), chunk_size)]
+    workers = min(workers or os.cpu_count() or 1, max(len(chunks), 1))
+    done = total - sum(len(requests) for requests in groups.values())
+    last_report = 0.0
+    
+    def collect(chunk_results):
+        nonlocal done, errors, last_report
+        for index, line, failed in chunk_results:
+            results[index] = line
+            errors += failed
+        done += len(chunk_results)
+        elapsed = time.perf_counter() - start
+        if elapsed - last_report < 0.5 and done < total:
+            return
+        last_report = elapsed
+        progress.write(f"\rProcessed {done:,}/{total:,} requests "
+                       f"({done / elapsed:,.0f}/s, {errors:,} errors)")
+        progress.flush()
+    
+    if workers == 1:
+        _init_batch_worker(cache_size, history_size)
+        for chunk in chunks:
+            collect(_run_batch_chunk(chunk))
+    else:
+        # Deferred like the other process pools: keeps engine startup fast
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                 initargs=(cache_size, history_size)) as pool:
+            futures = [pool.submit(_run_batch_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                collect(future.result())
+    
+    with open(output_path, "w") as out:
+        for line in results:
+            out.write(line + "\n")
+    
+    elapsed = time.perf_counter() - start
+    progress.write("\n")
+    summary = {
+        "requests": total,
+        "errors": errors,
+        "groups": {kind: len(requests) for kind, requests in groups.items()},
+        "workers": workers,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(total / elapsed) if elapsed else None,
+        "output_path": output_path
+    }
+    progress.write(json.dumps(summary) + "\n")
+    return summary
+
+
+def _option(args: List[str], name: str, default: int) -> int:
+    """Integer value of a `--name N` command-line option"""
+    if name in args:
+        return int(args[args.index(name) + 1])
+    return default
+
+
 def main():
     """
     Command-line interface for the calculator engine
     This shows how skills can be executed directly
     """
+    # Worker mode: stdout carries only NDJSON results, so no banner
+    if sys.argv[1:3] == ["serve", "--stdio"]:
+        serve_stdio(batch_size=_option(sys.argv, "--batch", 1),
+                    cache_size=_option(sys.argv, "--cache", 4096),
+                    history_size=_option(sys.argv, "--history", 1000))
+        return
+    if len(sys.argv) > 3 and sys.argv[1] == "batch":
+        run_batch_file(sys.argv[2], sys.argv[3],
+                       workers=_option(sys.argv, "--workers", 0) or None,
+                       chunk_size=_option(sys.argv, "--chunk", 2000),
+                       cache_size=_option(sys.argv, "--cache", 4096),
+                       history_size=_option(sys.argv, "--history", 0))
+        return
+    
     print("=" * 60)
     print("CALCULATOR ENGINE - Claude Skill Demonstration")
     print("=" * 60)
@@ -452,52 +1850,32 @@ def main():
             print(f"   Std Dev: {result.result['std_dev']}")
             print()
             
+        elif command == "loans" and len(sys.argv) > 3:
+            # Price a whole loan file in vectorized chunks
+            result = calc.loan_payment_file(sys.argv[2], sys.argv[3])
+            for step in result.steps:
+                print(f"   {step}")
+            
         elif command == "json" and len(sys.argv) > 2:
             # Parse JSON input for programmatic use
             import json
             data = json.loads(sys.argv[2])
+            calc.explain = data.get("explain", True)
             
-            if data["type"] == "basic":
-                result = calc.basic_operation(
-                    data["a"], 
-                    data["b"], 
-                    data["operation"]
-                )
-            elif data["type"] == "scientific":
-                result = calc.scientific_calculation(
-                    data["value"],
-                    data["function"]
-                )
-            elif data["type"] == "financial":
-                if data["calculation"] == "compound_interest":
-                    result = calc.compound_interest(
-                        data["principal"],
-                        data["rate"],
-                        data["time"],
-                        data.get("compounds_per_year", 12)
-                    )
-                elif data["calculation"] == "loan_payment":
-                    result = calc.loan_payment(
-                        data["principal"],
-                        data["rate"],
-                        data["years"]
-                    )
-            elif data["type"] == "statistical":
-                result = calc.statistics(data["data"])
+            result = run_request(calc, data)
             
             # Output as JSON
-            output = {
-                "result": result.result,
-                "formula": result.formula_used,
-                "steps": result.steps,
-                "metadata": result.metadata
-            }
-            print(json.dumps(output, indent=2))
+            output = result_payload(result)
+            print(json.dumps(output, indent=2, default=json_default))
         
         else:
             print("Usage:")
             print("  python calculator_engine.py demo")
             print("  python calculator_engine.py json '<json_input>'")
+            print("  python calculator_engine.py loans <input.csv|.npy> <output.csv>")
+            print("  python calculator_engine.py serve --stdio [--batch N] [--cache N] [--history N]")
+            print("  python calculator_engine.py batch <input.ndjson> <output.ndjson> "
+                  "[--workers N] [--chunk N] [--cache N] [--history N]")
     
     else:
         # Interactive mode
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Engine Server
+=============
+Serves CalculatorEngine over HTTP on a local TCP port or Unix socket,
+using only asyncio from the standard library.
+
+POST a request in the `json` command's schema to any path and get the
+same JSON object back (GET /stats reports counters). Two things keep the
+event loop fast under load:
+
+- Micro-batching: concurrent fast-mode ("explain": false) arithmetic and
+  square-root requests of the same kind are collected for a few
+  milliseconds and answered with one vectorized batch call. Only
+  operations whose NumPy kernels round exactly like Python's are batched,
+  so a batched answer is the same as the `json` command's.
+- CPU-heavy requests (statistics, Monte Carlo, graphing) run in a thread
+  pool, so cheap requests keep flowing while they compute.
+
+Usage:
+    python engine_server.py --tcp 127.0.0.1:8765
+    python engine_server.py --unix /tmp/calculator.sock
+"""
+
+import asyncio
+import json
+import math
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from calculator_engine import (
+    CalculatorEngine,
+    error_payload,
+    interned_metadata,
+    json_default,
+    result_payload,
+    run_request,
+    serving_engines,
+)
+from optional_deps import NUMPY_AVAILABLE, np
+
+# How long the first request of a batch waits for company, and the batch cap
+BATCH_WINDOW = 0.002
+MAX_BATCH = 4096
+
+# Request types whose work is slow enough to move off the event loop
+HEAVY_TYPES = {"statistical", "graphing"}
+HEAVY_CALCULATIONS = {"monte_carlo_growth"}
+
+# Operations whose NumPy ufuncs are correctly rounded (IEEE 754), like Python's
+# float operators and math.sqrt. NumPy's pow/log/tan kernels may differ from
+# libm in the last bit, which the rounding to engine precision can expose
+BATCHED_OPERATIONS = {"add", "subtract", "multiply", "divide"}
+BATCHED_FUNCTIONS = {"sqrt"}
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def batch_key(data: Dict[str, Any]) -> Optional[Tuple[str, ...]]:
+    """
+    Requests with the same key can share one vectorized call (None: run alone)
+    Only fast-mode float requests for exactly rounded operations qualify:
+    integer arithmetic stays exact (and unbounded) on the scalar path
+    """
+    if not NUMPY_AVAILABLE or data.get("explain", True):
+        return None
+    kind = data.get("type")
+    if (kind == "basic" and data.get("operation") in BATCHED_OPERATIONS
+            and _is_number(data.get("a")) and _is_number(data.get("b"))
+            and not (isinstance(data["a"], int) and isinstance(data["b"], int))):
+        return ("basic", data["operation"])
+    if (kind == "scientific" and data.get("function") in BATCHED_FUNCTIONS
+            and _is_number(data.get("value"))):
+        return ("scientific", data["function"])
+    return None
+
+
+def _batch_payloads(engine: CalculatorEngine, key: Tuple[str, ...],
+                    requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    One vectorized call for a whole batch, split back into the payloads the
+    scalar fast path would give (element-wise round(), no formula)
+    Raises if any element overflows, is invalid or comes out non-finite, so the
+    caller can fall back to the scalar path (which raises or answers exactly)
+    """
+    with np.errstate(all="raise"):
+        if key[0] == "basic":
+            outcome = engine.basic_operation_batch([r["a"] for r in requests],
+                                                   [r["b"] for r in requests], key[1],
+                                                   round_results=False)
+            metadata = interned_metadata(type="basic", operation=key[1])
+        else:
+            outcome = engine.scientific_calculation_batch([r["value"] for r in requests],
+                                                          key[1], round_results=False)
+            metadata = interned_metadata(type="scientific", function=key[1])
+
+    results = outcome.result.tolist()
+    if not all(math.isfinite(value) for value in results):
+        raise FloatingPointError("Non-finite result in batch")
+    return [{"result": round(value, engine.precision), "formula": "", "steps": [],
+             "metadata": metadata} for value in results]
+
+
+def _encode_response(status: int, payload: Dict[str, Any]) -> Tuple[int, bytes]:
+    """
+    Strict JSON body for a response
+    Infinity/NaN are not valid JSON, so such results become a 400 error
+    """
+    try:
+        content = json.dumps(payload, separators=(",", ":"), allow_nan=False,
+                             default=json_default)
+    except ValueError:
+        status = 400
+        error = {"error": "Result is not a finite number"}
+        if "id" in payload:
+            error["id"] = payload["id"]
+        content = json.dumps(error, separators=(",", ":"), default=json_default)
+    return status, content.encode("utf-8")
+
+
+class EngineServer:
+    """
+    Answers JSON requests for connections served by asyncio
+    Keeps one explained and one fast-mode engine sharing a memo cache
+    """
+
+    def __init__(self, batch_window: float = BATCH_WINDOW, max_batch: int = MAX_BATCH,
+                 workers: Optional[int] = None, cache_size: int = 4096,
+                 history_size: int = 1000):
+        self.engines = serving_engines(cache_size, history_size)
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.requests = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self._pending: Dict[Tuple[str, ...], list] = defaultdict(list)
+        self._timers: Dict[Tuple[str, ...], asyncio.TimerHandle] = {}
+
+    async def handle(self, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        """(HTTP status, JSON payload) for one request body"""
+        self.requests += 1
+        request_id = None
+        try:
+            data = json.loads(body)
+            if not isinstance(data, dict):
+                raise ValueError("Request must be a JSON object")
+            request_id = data.get("id")
+            payload = await self._run(data)
+            status = 200
+        except Exception as e:
+            payload, status = error_payload(e), 400
+        if request_id is not None:
+            payload["id"] = request_id
+        return status, payload
+
+    async def _run(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        key = batch_key(data)
+        if key is not None:
+            return await self._submit(key, data)
+
+        engine = self.engines[bool(data.get("explain", True))]
+        if data.get("type") in HEAVY_TYPES or data.get("calculation") in HEAVY_CALCULATIONS:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, run_request, engine, data)
+        else:
+            result = run_request(engine, data)
+        return result_payload(result)
+
+    async def _submit(self, key: Tuple[str, ...], data: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a request for its batch and wait for the batch to run"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending[key]
+        pending.append((data, future))
+        if len(pending) == 1:
+            self._timers[key] = loop.call_later(self.batch_window, self._flush, key)
+        elif len(pending) >= self.max_batch:
+            self._flush(key)
+        return await future
+
+    def _flush(self, key: Tuple[str, ...]) -> None:
+        """Run everything queued under key as one vectorized call"""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()  # Flushed early because the batch filled up
+        batch = self._pending.pop(key)
+        requests = [data for data, _ in batch]
+        engine = self.engines[False]
+        try:
+            payloads = _batch_payloads(engine, key, requests)
+            self.batches += 1
+            self.batched_requests += len(batch)
+        except Exception:
+            # One bad operand (e.g. division by zero) fails the whole vectorized
+            # call; answer each request on its own so only that one gets the error
+            payloads = []
+            for data in requests:
+                try:
+                    payloads.append(result_payload(run_request(engine, data)))
+                except Exception as e:
+                    payloads.append(e)
+
+        for (_, future), payload in zip(batch, payloads):
+            if future.done():
+                continue
+            if isinstance(payload, Exception):
+                future.set_exception(payload)
+            else:
+                future.set_result(payload)
+
+    def stats(self) -> Dict[str, Any]:
+        """Request, batching, memo cache and latency counters"""
+        engine = self.engines[True]
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "batched_requests": self.batched_requests,
+            "memo_cache": engine.memo_cache.stats() if engine.memo_cache else None,
+            "latency": {"explained" if explain else "fast": e.history.latency_stats()
+                        for explain, e in self.engines.items()}
+        }
+
+    async def serve_connection(self, reader: asyncio.StreamReader,
+                               writer: asyncio.StreamWriter) -> None:
+        """Minimal HTTP/1.1 with keep-alive: POST runs a request, GET /stats reports"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, version = request_line.decode("latin-1").split()
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                if method == "POST":
+                    status, payload = await self.handle(body)
+                elif method == "GET" and path == "/stats":
+                    status, payload = 200, self.stats()
+                elif method == "GET":
+                    status, payload = 404, {"error": f"Not found: {path}"}
+                else:
+                    status, payload = 405, {"error": f"Method not allowed: {method}"}
+
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version != "HTTP/1.0")
+                status, content = _encode_response(status, payload)
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(content)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    .encode("latin-1") + content
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass  # Client went away or sent something that isn't HTTP
+        finally:
+            writer.close()
+
+
+async def run_server(tcp: Optional[str] = None, unix: Optional[str] = None,
+                     **options) -> None:
+    """Serve until cancelled, on host:port (tcp) or a Unix socket path"""
+    server = EngineServer(**options)
+    if unix:
+        listener = await asyncio.start_unix_server(server.serve_connection, path=unix)
+        where = unix
+    else:
+        host, _, port = (tcp or "127.0.0.1:8765").rpartition(":")
+        listener = await asyncio.start_server(server.serve_connection, host or "127.0.0.1",
+                                              int(port))
+        where = f"{host or '127.0.0.1'}:{port}"
+
+    print(f"Calculator engine listening on {where}", file=sys.stderr)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    """Command-line entry point"""
+    args = sys.argv[1:]
+    if "--unix" in args:
+        options = {"unix": args[args.index("--unix") + 1]}
+    elif "--tcp" in args:
+        options = {"tcp": args[args.index("--tcp") + 1]}
+    else:
+        print(__doc__)
+        sys.exit(2)
+
+    try:
+        asyncio.run(run_server(**options))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
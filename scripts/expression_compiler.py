@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Expression Compiler
+===================
+Turns a function string like "sin(x) * 2 + 1" into a reusable callable.
+
+Expressions are parsed once with `ast`, checked against a whitelist of
+node types and names, constant-folded and compiled to a code object.
+Compiled expressions are kept in an LRU cache keyed by the normalized
+expression text, so repeated graph requests skip parsing entirely.
+"""
+
+import ast
+import math
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+
+from optional_deps import NUMPY_AVAILABLE, np
+
+
+# Syntax allowed in an expression; anything else is rejected before compiling
+ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod, ast.USub, ast.UAdd
+)
+
+# Names an expression may use (the variable is always `x`)
+ALLOWED_FUNCTIONS = ("sin", "cos", "tan", "exp", "log", "sqrt", "abs")
+ALLOWED_CONSTANTS = {"pi": math.pi, "e": math.e}
+VARIABLE = "x"
+
+
+def _function_namespace() -> Dict[str, Any]:
+    """Vectorized implementations for the whitelisted function names"""
+    if NUMPY_AVAILABLE:
+        return {name: getattr(np, name) for name in ALLOWED_FUNCTIONS}
+    return {name: getattr(math, name) if name != "abs" else abs for name in ALLOWED_FUNCTIONS}
+
+
+def normalize_expression(text: str) -> str:
+    """Cache key for an expression: no whitespace around operators, other runs collapsed"""
+    text = re.sub(r"\s*([-+*/%(),])\s*", r"\1", text.strip())
+    return re.sub(r"\s+", " ", text)
+
+
+class _Validator(ast.NodeVisitor):
+    """Rejects any node type or name outside the whitelist"""
+
+    def generic_visit(self, node):
+        if not isinstance(node, ALLOWED_NODES):
+            raise ValueError(f"Unsupported expression element: {type(node).__name__}")
+        super().generic_visit(node)
+
+    def visit_Name(self, node):
+        # Function names only appear as call targets, which visit_Call checks
+        if node.id != VARIABLE and node.id not in ALLOWED_CONSTANTS:
+            raise ValueError(f"Unknown name: {node.id}")
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.func.id not in ALLOWED_FUNCTIONS:
+            raise ValueError("Only whitelisted functions can be called")
+        # Every whitelisted function takes exactly one argument; NumPy would
+        # read a second positional one as out= and write into it
+        if node.keywords or len(node.args) != 1:
+            raise ValueError(f"{node.func.id}() takes exactly one argument")
+        self.visit(node.args[0])
+
+    def visit_Constant(self, node):
+        if not isinstance(node.value, (int, float)) or isinstance(node.value, bool):
+            raise ValueError(f"Unsupported constant: {node.value!r}")
+
+
+class _ConstantFolder(ast.NodeTransformer):
+    """Pre-computes every sub-expression that does not depend on x"""
+
+    def __init__(self, functions: Dict[str, Any]):
+        self.functions = functions
+
+    def _fold(self, node, compute):
+        try:
+            value = float(compute())
+        except (ArithmeticError, ValueError, TypeError):
+            return node  # Leave it for runtime so NumPy can produce inf/nan
+        if not math.isfinite(value):
+            return node
+        return ast.copy_location(ast.Constant(value=value), node)
+
+    def visit_Name(self, node):
+        if node.id in ALLOWED_CONSTANTS:
+            return ast.copy_location(ast.Constant(value=ALLOWED_CONSTANTS[node.id]), node)
+        return node
+
+    def visit_Constant(self, node):
+        # Integer literals become floats, so "7**99999999" overflows at once
+        # (folding or at runtime) instead of computing a huge exact integer
+        if isinstance(node.value, int):
+            try:
+                value = float(node.value)
+            except OverflowError:
+                value = math.inf
+            return ast.copy_location(ast.Constant(value=value), node)
+        return node
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.operand, ast.Constant):
+            expr = ast.Expression(body=node)
+            return self._fold(node, lambda: eval(compile(
+                ast.fix_missing_locations(expr), "<fold>", "eval"), {"__builtins__": {}}))
+        return node
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.left, ast.Constant) and isinstance(node.right, ast.Constant):
+            expr = ast.Expression(body=node)
+            return self._fold(node, lambda: eval(compile(
+                ast.fix_missing_locations(expr), "<fold>", "eval"), {"__builtins__": {}}))
+        return node
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        if all(isinstance(arg, ast.Constant) for arg in node.args):
+            func = self.functions[node.func.id]
+            if NUMPY_AVAILABLE:
+                with np.errstate(all="ignore"):
+                    return self._fold(node, lambda: func(*[arg.value for arg in node.args]))
+            return self._fold(node, lambda: func(*[arg.value for arg in node.args]))
+        return node
+
+
+class ExpressionCompiler:
+    """
+    Parses, validates and compiles expressions of x, with an LRU cache
+    Thread-safe, so one instance can be shared by concurrent graph requests
+    """
+
+    def __init__(self, maxsize: int = 128):
+        """Create an empty cache holding up to `maxsize` compiled expressions"""
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[str, Callable]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._functions = None  # Built on first compile so numpy loads lazily
+
+    def compile(self, text: str) -> Callable:
+        """Return a callable f(x) for the expression, compiling it on a cache miss"""
+        key = normalize_expression(text)
+        with self._lock:
+            func = self._cache.get(key)
+            if func is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return func
+            self.misses += 1
+
+        func = self._build(key)
+        with self._lock:
+            self._cache[key] = func
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return func
+
+    def _build(self, text: str) -> Callable:
+        """Parse, validate, fold and compile one expression"""
+        try:
+            tree = ast.parse(text, mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid expression: {e.msg}")
+
+        _Validator().visit(tree)
+        if self._functions is None:
+            self._functions = _function_namespace()
+        tree = ast.fix_missing_locations(_ConstantFolder(self._functions).visit(tree))
+        code = compile(tree, "<expression>", "eval")
+        namespace = {"__builtins__": {}, **self._functions}
+
+        def evaluate(x):
+            return eval(code, namespace, {VARIABLE: x})
+
+        evaluate.expression = text
+        return evaluate
+
+    def cache_info(self) -> Dict[str, int]:
+        """Hit/miss counters and current cache size"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._cache),
+                "maxsize": self.maxsize
+            }
+
+    def clear(self) -> None:
+        """Drop every cached expression and reset the counters"""
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Shared compiler used by the calculator engine
+default_compiler = ExpressionCompiler()
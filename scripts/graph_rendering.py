@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Graph Rendering
+===============
+Draws function graphs straight onto matplotlib's Agg canvas.
+
+pyplot keeps a global "current figure", so two graph requests running at
+the same time can draw over each other, and each one pays for building a
+new figure. Here every request borrows its own Figure from a small pool,
+renders it to PNG or SVG bytes in memory and hands it back, so one
+process can serve many graph requests in parallel without touching disk.
+"""
+
+import io
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+from optional_deps import MATPLOTLIB_AVAILABLE as RENDERING_AVAILABLE
+
+
+IMAGE_FORMATS = ("png", "svg")
+
+
+class FigurePool:
+    """
+    A bounded set of reusable Figure objects
+    Callers block when every figure is in use, so memory stays fixed
+    """
+
+    def __init__(self, size: int = 4, figsize: Tuple[float, float] = (10, 6)):
+        """Create a pool that builds up to `size` figures on demand"""
+        self.size = size
+        self.figsize = figsize
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def figure(self):
+        """Borrow a cleared figure for the duration of a with-block"""
+        fig = self._acquire()
+        try:
+            yield fig
+        finally:
+            fig.clear()
+            self._idle.put(fig)
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                # Imported here so matplotlib only loads once something is drawn
+                from matplotlib.backends.backend_agg import FigureCanvasAgg
+                from matplotlib.figure import Figure
+                
+                self._created += 1
+                fig = Figure(figsize=self.figsize)
+                FigureCanvasAgg(fig)
+                return fig
+        return self._idle.get()
+
+
+# Shared pool used by render_function_graph
+default_pool = FigurePool() if RENDERING_AVAILABLE else None
+
+
+def render_function_graph(x, y, title: str, image_format: str = "png", dpi: int = 100,
+                          y_limits: Optional[Tuple[float, float]] = None,
+                          pool: Optional[FigurePool] = None,
+                          x_label: str = "x", y_label: str = "f(x)") -> bytes:
+    """
+    Render one curve on axes to PNG or SVG bytes
+    Matches the look of the original pyplot graph
+    """
+    if not RENDERING_AVAILABLE:
+        raise RuntimeError("Rendering requires matplotlib")
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unknown image format: {image_format}")
+
+    with (pool or default_pool).figure() as fig:
+        ax = fig.add_subplot()
+        ax.plot(x, y, 'b-', linewidth=2)
+        ax.grid(True, alpha=0.3)
+        ax.set_xlabel(x_label)
+        ax.set_ylabel(y_label)
+        ax.set_title(title)
+        ax.axhline(y=0, color='k', linewidth=0.5)
+        ax.axvline(x=0, color='k', linewidth=0.5)
+        if y_limits:
+            ax.set_ylim(*y_limits)
+
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=image_format, dpi=dpi, bbox_inches='tight')
+        return buffer.getvalue()
+
+
+def render_fan_chart(years, bands, percentiles, title: str, image_format: str = "png",
+                     dpi: int = 100, pool: Optional[FigurePool] = None) -> bytes:
+    """
+    Render percentile bands over time as a fan chart
+    bands[i] holds the percentiles[i] curve; symmetric pairs are shaded
+    """
+    if not RENDERING_AVAILABLE:
+        raise RuntimeError("Rendering requires matplotlib")
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unknown image format: {image_format}")
+
+    with (pool or default_pool).figure() as fig:
+        ax = fig.add_subplot()
+        # Shade symmetric pairs of bands from the outside in
+        for i in range(len(percentiles) // 2):
+            ax.fill_between(years, bands[i], bands[-1 - i], color='b', alpha=0.15,
+                            label=f"p{percentiles[i]:g}–p{percentiles[-1 - i]:g}")
+        if len(percentiles) % 2:
+            mid = len(percentiles) // 2
+            ax.plot(years, bands[mid], 'b-', linewidth=2, label=f"p{percentiles[mid]:g}")
+        ax.grid(True, alpha=0.3)
+        ax.set_xlabel('Years')
+        ax.set_ylabel('Amount')
+        ax.set_title(title)
+        ax.legend(loc='upper left')
+
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=image_format, dpi=dpi, bbox_inches='tight')
+        return buffer.getvalue()
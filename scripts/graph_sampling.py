@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Graph Sampling
+==============
+Chooses which x values a function graph is evaluated at.
+
+Instead of a fixed dense grid, adaptive_sample() starts coarse and only
+subdivides segments where the curve bends or jumps, up to a point
+budget. Flat regions stay cheap and sharp features (peaks, asymptotes
+such as tan(x)) still get the resolution they need.
+
+For data that already has far more points than a graph can show (raw
+data sets, long evaluated curves), decimate() reduces it to a target
+point count with Largest-Triangle-Three-Buckets or Ramer-Douglas-Peucker
+while keeping the visual shape.
+"""
+
+import heapq
+from typing import Callable, List, Optional, Tuple
+
+from optional_deps import NUMPY_AVAILABLE, np
+
+
+def _vectorized(func: Callable):
+    """Evaluate func on an array, broadcasting constants and silencing domain warnings"""
+    def evaluate(x):
+        with np.errstate(all="ignore"):
+            return np.broadcast_to(np.asarray(func(x), dtype=float), x.shape)
+    return evaluate
+
+
+def adaptive_sample(func: Callable, x_min: float, x_max: float,
+                    max_points: int = 1000, initial_points: int = 65,
+                    tolerance: float = 1e-3, max_depth: int = 14) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Sample func on [x_min, x_max] by recursive midpoint refinement
+    A segment is split when its midpoint is more than `tolerance` (relative
+    to the curve's height) away from the straight line between its ends.
+    Jumps across a pole are broken with NaN so asymptotes are not drawn
+    as vertical lines.
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("Adaptive sampling requires numpy")
+
+    evaluate = _vectorized(func)
+    x = np.linspace(x_min, x_max, min(initial_points, max_points))
+    y = evaluate(x)
+
+    # Height of the curve, ignoring the extremes so asymptotes don't flatten it
+    finite = y[np.isfinite(y)]
+    if finite.size:
+        low, high = np.percentile(finite, [5, 95])
+        scale = high - low or max(abs(high), 1.0)
+    else:
+        scale = 1.0
+    min_width = (x_max - x_min) / (initial_points - 1) / 2 ** max_depth
+
+    # Every big jump may need a NaN break at the end, so each one holds a slot
+    jump = np.abs(np.diff(y)) > scale
+    while x.size + jump.sum() < max_points:
+        mid_x = (x[:-1] + x[1:]) / 2
+        mid_y = evaluate(mid_x)
+        error = np.abs(mid_y - (y[:-1] + y[1:]) / 2)
+        # A non-finite midpoint or end counts as maximal error, unless the
+        # whole segment is undefined (e.g. log(x) for x < 0): nothing to draw there
+        undefined = ~np.isfinite(y[:-1]) & ~np.isfinite(y[1:]) & ~np.isfinite(mid_y)
+        error[~np.isfinite(error)] = np.inf
+        error[undefined] = 0.0
+
+        split = (error > tolerance * scale) & (np.diff(x) > min_width)
+        if not split.any():
+            break
+
+        # Splitting costs the new point plus any change in held break slots
+        cost = (1 + (np.abs(mid_y - y[:-1]) > scale) + (np.abs(y[1:] - mid_y) > scale)
+                - jump)
+        budget = max_points - x.size - int(jump.sum())
+        if cost[split].sum() > budget:
+            worst = np.argsort(np.where(split, error, -1.0))[::-1][:int(split.sum())]
+            worst = worst[np.cumsum(cost[worst]) <= budget]
+            if not worst.size:
+                break
+            split = np.zeros_like(split)
+            split[worst] = True
+
+        x = np.concatenate([x, mid_x[split]])
+        y = np.concatenate([y, mid_y[split]])
+        order = np.argsort(x, kind="stable")
+        x, y = x[order], y[order]
+        jump = np.abs(np.diff(y)) > scale
+
+    # Break the line at poles: a big jump whose midpoint isn't between its ends
+    candidates = np.flatnonzero(jump)
+    if candidates.size:
+        left, right = y[candidates], y[candidates + 1]
+        mid_x = (x[candidates] + x[candidates + 1]) / 2
+        mid_y = evaluate(mid_x)
+        inside = (mid_y >= np.minimum(left, right)) & (mid_y <= np.maximum(left, right))
+        # Only a starting grid already past the budget can leave too few slots
+        breaks = candidates[~inside][:max(max_points - x.size, 0)]
+        x = np.insert(x, breaks + 1, mid_x[~inside][:breaks.size])
+        y = np.insert(y, breaks + 1, np.nan)
+
+    return x, y
+
+
+def uniform_sample(func: Callable, x_min: float, x_max: float,
+                   points: int = 1000) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Evaluate func on an evenly spaced grid (the original graphing behavior)"""
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("Sampling requires numpy")
+    x = np.linspace(x_min, x_max, points)
+    return x, _vectorized(func)(x)
+
+
+def robust_limits(y, spread: float = 10.0) -> Optional[Tuple[float, float]]:
+    """
+    Y-axis limits that ignore spikes near asymptotes
+    Returns None when the full range is already a sensible view
+    """
+    finite = y[np.isfinite(y)]
+    if finite.size < 2:
+        return None
+    low, high = np.percentile(finite, [2, 98])
+    span = high - low
+    if span == 0 or finite.max() - finite.min() <= spread * span:
+        return None
+    return float(low - 0.1 * span), float(high + 0.1 * span)
+
+
+# ============================================
+# DECIMATION
+# ============================================
+
+DECIMATION_METHODS = ("lttb", "rdp")
+
+
+def lttb(x, y, target: int) -> "np.ndarray":
+    """
+    Largest-Triangle-Three-Buckets: indices of `target` points to keep
+    Keeps the first and last point, and from every bucket in between the
+    point forming the largest triangle with its neighbors' picks
+    """
+    n = x.size
+    if target >= n:
+        return np.arange(n)
+    if target < 3:
+        return np.array([0, n - 1])
+
+    edges = np.linspace(1, n - 1, target - 1).astype(np.int64)
+    keep = np.empty(target, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    previous = 0
+
+    for i in range(target - 2):
+        start, stop = edges[i], edges[i + 1]
+        # The next bucket's average stands in for the not-yet-chosen next point
+        next_stop = edges[i + 2] if i + 2 < target - 1 else n
+        next_x = x[stop:next_stop].mean()
+        next_y = y[stop:next_stop].mean()
+
+        area = np.abs((x[previous] - next_x) * (y[start:stop] - y[previous])
+                      - (x[previous] - x[start:stop]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        keep[i + 1] = previous
+
+    return keep
+
+
+def rdp(x, y, target: int) -> "np.ndarray":
+    """
+    Ramer-Douglas-Peucker driven by a point budget: indices of `target` points
+    Repeatedly splits the segment whose farthest point deviates the most
+    """
+    n = x.size
+    if target >= n:
+        return np.arange(n)
+
+    def farthest(start: int, stop: int):
+        if stop - start < 2:
+            return 0.0, -1
+        dx, dy = x[stop] - x[start], y[stop] - y[start]
+        inner_x, inner_y = x[start + 1:stop], y[start + 1:stop]
+        distance = np.abs(dy * (inner_x - x[start]) - dx * (inner_y - y[start]))
+        best = int(np.argmax(distance))
+        return float(distance[best]) / (np.hypot(dx, dy) or 1.0), start + 1 + best
+
+    keep = [0, n - 1]
+    deviation, index = farthest(0, n - 1)
+    heap = [(-deviation, 0, n - 1, index)]
+    while heap and len(keep) < target:
+        negative, start, stop, index = heapq.heappop(heap)
+        if index < 0 or negative == 0:
+            break
+        keep.append(index)
+        for a, b in ((start, index), (index, stop)):
+            deviation, split = farthest(a, b)
+            if split >= 0:
+                heapq.heappush(heap, (-deviation, a, b, split))
+
+    return np.sort(np.array(keep, dtype=np.int64))
+
+
+def decimate(x, y, target: int, method: str = "lttb") -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Reduce a series to at most `target` points, preserving its visual shape
+    NaN gaps are kept as breaks in the line, each costing one NaN point. When
+    there are more finite runs than the budget can draw (a run needs two
+    points plus its break), the runs across the narrowest gaps are joined
+    into one. The budget is shared in proportion to run length
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("Decimation requires numpy")
+    if method not in DECIMATION_METHODS:
+        raise ValueError(f"Unknown decimation method: {method}")
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if x.size <= target:
+        return x, y
+
+    picker = lttb if method == "lttb" else rdp
+    finite = np.isfinite(y)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], finite.astype(np.int8), [0]))))
+    starts, stops = edges[::2], edges[1::2]
+    if starts.size == 0:
+        # Nothing to draw: keep the two ends so the plot still spans the x range
+        ends = np.array([0, x.size - 1])
+        return x[ends], y[ends]
+
+    # Keep only the widest gaps as breaks; runs across the others are joined
+    max_runs = max(1, (target + 1) // 3)
+    if starts.size > max_runs:
+        widths = x[starts[1:]] - x[stops[:-1] - 1]
+        breaks = np.sort(np.argsort(widths, kind="stable")[widths.size - (max_runs - 1):])
+        starts = np.concatenate(([starts[0]], starts[breaks + 1]))
+        stops = np.concatenate((stops[breaks], [stops[-1]]))
+
+    groups = [start + np.flatnonzero(finite[start:stop]) for start, stop in zip(starts, stops)]
+    sizes = np.array([group.size for group in groups])
+    floors = np.minimum(sizes, 2)
+    spare = max(target - (len(groups) - 1) - int(floors.sum()), 0)
+    shares = floors + (spare * (sizes - floors) // max(int((sizes - floors).sum()), 1))
+
+    xs: List["np.ndarray"] = []
+    ys: List["np.ndarray"] = []
+    for group, share in zip(groups, shares.tolist()):
+        keep = group[picker(x[group], y[group], share)]
+        if xs:
+            xs.append(np.array([(xs[-1][-1] + x[keep[0]]) / 2]))
+            ys.append(np.array([np.nan]))
+        xs.append(x[keep])
+        ys.append(y[keep])
+
+    return np.concatenate(xs), np.concatenate(ys)
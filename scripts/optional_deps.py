@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Optional Dependencies
+=====================
+Detects numpy/matplotlib without importing them, and imports them lazily.
+
+Importing numpy and matplotlib costs hundreds of milliseconds, which a
+plain `calculator_engine.py json '{"type": "basic", ...}'` call never
+needs. Modules use the `np` proxy below instead of `import numpy as np`:
+the real import only happens the first time an attribute is looked up,
+i.e. when a vectorized or graphing path actually runs.
+"""
+
+import importlib
+import importlib.util
+import threading
+
+
+def module_available(name: str) -> bool:
+    """True if a top-level module can be imported (checked without importing it)"""
+    return importlib.util.find_spec(name) is not None
+
+
+class LazyModule:
+    """
+    Stand-in for a module that imports it on first attribute access
+    Looked-up attributes are cached on the proxy, so later lookups are plain
+    attribute reads
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._module is None:
+                self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        value = getattr(self._module or self._load(), attr)
+        setattr(self, attr, value)
+        return value
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+NUMPY_AVAILABLE = module_available("numpy")
+MATPLOTLIB_AVAILABLE = module_available("matplotlib")
+
+# Shared lazy handle used in place of `import numpy as np`
+np = LazyModule("numpy")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Render Cache
+============
+A content-addressed, on-disk cache for rendered graphs.
+
+Each image is stored under a SHA-256 hash of everything that affects its
+pixels (normalized expression, range, sampling, size, dpi, backend and
+format), so a repeated graph request becomes a file lookup. Writes go to
+a temporary file that is atomically renamed into place, and the cache
+directory is kept under a size cap by evicting the least recently used
+files (recency is the file's modification time, refreshed on every hit).
+Several processes can share the directory: each one tracks its own
+writes and re-reads the directory's real size at least every
+RESCAN_INTERVAL seconds, so files written by the others count against
+the cap too.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+# Eviction frees space down to this fraction of the cap, so the next few
+# writes don't each trigger another directory scan
+LOW_WATER = 0.9
+
+# Seconds between re-reads of the directory size (other processes' writes)
+RESCAN_INTERVAL = 60.0
+
+
+class RenderCache:
+    """
+    Size-capped LRU cache of rendered images in a directory
+    Hit/miss/eviction counters are kept per instance
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        """Use (and create, if needed) `directory`, holding at most `max_bytes`"""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._bytes = sum(size for _, size, _ in self._entries())
+        self._next_scan = time.monotonic() + RESCAN_INTERVAL
+
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """Stable hash of the render parameters"""
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, image_format: str) -> str:
+        return os.path.join(self.directory, f"{key}.{image_format}")
+
+    def get(self, key: str, image_format: str) -> Optional[str]:
+        """Path of the cached image, or None on a miss"""
+        path = self._path(key, image_format)
+        try:
+            os.utime(path)  # Mark as most recently used
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def put(self, key: str, image_format: str, data: bytes) -> str:
+        """Atomically store an image and return its path"""
+        path = self._path(key, image_format)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            # Replacing an existing file (e.g. a concurrent render of the same
+            # key) frees its bytes
+            try:
+                replaced = os.path.getsize(path)
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        with self._lock:
+            self._bytes += len(data) - replaced
+            due = self._bytes > self.max_bytes or time.monotonic() >= self._next_scan
+        if due:
+            self._evict(keep=path)
+        return path
+
+    def _entries(self):
+        """(path, size, mtime) for every finished cache file"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # Evicted by another process meanwhile
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """
+        Re-read the directory size and, if it is over the cap, delete least
+        recently used files until it is down to LOW_WATER of the cap
+        """
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            if total > self.max_bytes:
+                for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+                    if total <= self.max_bytes * LOW_WATER:
+                        break
+                    if path == keep:
+                        continue
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+                    total -= size
+                    self.evictions += 1
+            self._bytes = total
+            self._next_scan = time.monotonic() + RESCAN_INTERVAL
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters and current size"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes
+            }
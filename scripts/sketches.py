@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Streaming Sketches
+==================
+Fixed-size summaries that stand in for the exact median and mode when
+the data is an unbounded stream.
+
+- TDigest approximates quantiles with a bounded number of centroids.
+- SpaceSaving tracks the most frequent values (the mode) with a fixed
+  number of counters.
+
+Both sketches can be merged with another sketch of the same kind and
+round-trip through plain dicts (to_dict/from_dict), so each worker can
+summarize its own shard and send the result to a coordinator as JSON.
+"""
+
+import heapq
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from optional_deps import NUMPY_AVAILABLE, np
+
+
+class TDigest:
+    """
+    Merging t-digest for approximate quantiles
+    Higher compression keeps more centroids and gives tighter estimates
+    """
+
+    def __init__(self, compression: float = 100):
+        """Create an empty digest"""
+        if compression <= 0:
+            raise ValueError("Compression must be positive")
+        self.compression = float(compression)
+        self.means: List[float] = []
+        self.weights: List[float] = []
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer: List[Tuple[float, float]] = []
+
+    # Scale function k1 and its inverse: centroids near the tails stay small
+    def _k(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _k_inverse(self, k: float) -> float:
+        return (math.sin(2 * math.pi * k / self.compression) + 1) / 2
+
+    @property
+    def rank_error(self) -> float:
+        """Largest fraction of the data a single centroid may cover (at the median)"""
+        return math.pi / self.compression
+
+    def push(self, x: float, weight: float = 1.0) -> None:
+        """Add one value"""
+        x = float(x)
+        self._buffer.append((x, weight))
+        self.total += weight
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+        if len(self._buffer) >= 5 * self.compression:
+            self._compress()
+
+    def push_many(self, values: Iterable[float]) -> None:
+        """
+        Add a chunk of values
+        NumPy chunks are pre-digested with one sort and a grouped sum
+        """
+        if not NUMPY_AVAILABLE:
+            for x in values:
+                self.push(x)
+            return
+
+        chunk = np.sort(np.asarray(values, dtype=float).ravel())
+        n = chunk.size
+        if n == 0:
+            return
+
+        # Points sharing a unit of the scale function form one centroid
+        q = (np.arange(n) + 0.5) / n
+        bucket = np.floor(self.compression / (2 * math.pi) * np.arcsin(2 * q - 1))
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(bucket)) + 1))
+        sums = np.add.reduceat(chunk, starts)
+        counts = np.diff(np.append(starts, n))
+
+        self._buffer.extend(zip((sums / counts).tolist(), counts.astype(float).tolist()))
+        self.total += n
+        self.min = min(self.min, float(chunk[0]))
+        self.max = max(self.max, float(chunk[-1]))
+        self._compress()
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """Fold another digest into this one and return self"""
+        other._compress()
+        self._buffer.extend(zip(other.means, other.weights))
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _compress(self) -> None:
+        """Merge buffered points and existing centroids under the size limit"""
+        if not self._buffer:
+            return
+
+        items = sorted(list(zip(self.means, self.weights)) + self._buffer)
+        self._buffer = []
+
+        means, weights = [items[0][0]], [items[0][1]]
+        weight_so_far = 0.0
+        q_limit = self._k_inverse(self._k(0.0) + 1)
+
+        for mean, weight in items[1:]:
+            q = (weight_so_far + weights[-1] + weight) / self.total
+            if q <= q_limit:
+                merged = weights[-1] + weight
+                means[-1] += (mean - means[-1]) * weight / merged
+                weights[-1] = merged
+            else:
+                weight_so_far += weights[-1]
+                q_limit = self._k_inverse(self._k(weight_so_far / self.total) + 1)
+                means.append(mean)
+                weights.append(weight)
+
+        self.means, self.weights = means, weights
+
+    def quantile(self, q: float) -> float:
+        """Estimate the value at fraction q (0..1) of the data"""
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile out of range: {q}")
+        self._compress()
+        if not self.means:
+            raise ValueError("Digest is empty")
+        if len(self.means) == 1:
+            return self.means[0]
+
+        target = q * self.total
+        cumulative = 0.0
+        previous_center = 0.0
+        previous_mean = self.min
+
+        # Interpolate between centroid centers (and the true min/max at the ends)
+        for mean, weight in zip(self.means, self.weights):
+            center = cumulative + weight / 2
+            if target < center:
+                span = center - previous_center
+                fraction = (target - previous_center) / span if span else 0.0
+                return previous_mean + (mean - previous_mean) * fraction
+            cumulative += weight
+            previous_center, previous_mean = center, mean
+
+        span = self.total - previous_center
+        fraction = (target - previous_center) / span if span else 1.0
+        return previous_mean + (self.max - previous_mean) * fraction
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain, JSON-serializable form"""
+        self._compress()
+        return {
+            "compression": self.compression,
+            "means": list(self.means),
+            "weights": list(self.weights),
+            "min": self.min,
+            "max": self.max
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TDigest":
+        """Rebuild a digest produced by to_dict"""
+        digest = cls(data["compression"])
+        digest.means = [float(m) for m in data["means"]]
+        digest.weights = [float(w) for w in data["weights"]]
+        digest.total = sum(digest.weights)
+        digest.min = float(data["min"])
+        digest.max = float(data["max"])
+        return digest
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter counter for the approximate mode
+    Each reported count overestimates the true one by at most total/capacity
+    """
+
+    def __init__(self, capacity: int = 64):
+        """Create an empty counter table"""
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+        self.capacity = int(capacity)
+        self.counts: Dict[float, int] = {}
+        self.errors: Dict[float, int] = {}
+        self.total = 0
+        # Min-heap of (count, value), one entry per tracked value. Counts only
+        # grow, so an entry may lag behind; it is refreshed when it surfaces
+        self._heap: List[Tuple[int, float]] = []
+
+    @property
+    def count_error(self) -> float:
+        """Upper bound on how far any reported count can be too high"""
+        return self.total / self.capacity
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [(count, x) for x, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def _evict_smallest(self) -> int:
+        """Drop the value with the smallest counter and return that count"""
+        heap = self._heap
+        while True:
+            count, x = heap[0]
+            current = self.counts[x]
+            if current == count:
+                heapq.heappop(heap)
+                del self.counts[x]
+                del self.errors[x]
+                return count
+            heapq.heapreplace(heap, (current, x))
+
+    def push(self, x: float, weight: int = 1) -> None:
+        """Add one value (or `weight` copies of it)"""
+        self.total += weight
+        if x in self.counts:
+            self.counts[x] += weight
+            return
+        if len(self.counts) < self.capacity:
+            floor = 0
+        else:
+            # The evicted counter's count becomes the newcomer's error
+            floor = self._evict_smallest()
+        self.counts[x] = floor + weight
+        self.errors[x] = floor
+        heapq.heappush(self._heap, (floor + weight, x))
+
+    def push_many(self, values: Iterable[float]) -> None:
+        """
+        Add a chunk of values
+        NumPy chunks are counted exactly, cut to their top `capacity` values
+        and merged in, so the result does not depend on the order of the chunk
+        """
+        if not NUMPY_AVAILABLE:
+            for x in values:
+                self.push(float(x))
+            return
+
+        chunk = np.asarray(values, dtype=float).ravel()
+        if chunk.size == 0:
+            return
+        unique, counts = np.unique(chunk, return_counts=True)
+        if unique.size > self.capacity:
+            top = np.argpartition(counts, unique.size - self.capacity)[-self.capacity:]
+            unique, counts = unique[top], counts[top]
+
+        summary = SpaceSaving(self.capacity)
+        summary.counts = dict(zip(unique.tolist(), counts.tolist()))
+        summary.errors = dict.fromkeys(summary.counts, 0)
+        summary.total = chunk.size
+        self.merge(summary)
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """
+        Fold another counter table into this one and return self
+        Values missing from a full table are charged that table's smallest count
+        """
+        floor_self = min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+        floor_other = min(other.counts.values()) if len(other.counts) >= other.capacity else 0
+
+        counts, errors = {}, {}
+        for x in set(self.counts) | set(other.counts):
+            counts[x] = self.counts.get(x, floor_self) + other.counts.get(x, floor_other)
+            errors[x] = self.errors.get(x, floor_self) + other.errors.get(x, floor_other)
+
+        keep = heapq.nlargest(self.capacity, counts, key=counts.get)
+        self.counts = {x: counts[x] for x in keep}
+        self.errors = {x: errors[x] for x in keep}
+        self.total += other.total
+        self._rebuild_heap()
+        return self
+
+    def mode(self) -> Optional[float]:
+        """
+        Value with the highest guaranteed count (count minus error)
+        None when empty, or when no value provably stands out: its guaranteed
+        count must exceed count_error, or any untracked value could beat it
+        """
+        if not self.counts:
+            return None
+        best = max(self.counts, key=lambda x: self.counts[x] - self.errors[x])
+        if self.counts[best] - self.errors[best] <= self.count_error:
+            return None
+        return best
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain, JSON-serializable form"""
+        return {
+            "capacity": self.capacity,
+            "items": [[x, self.counts[x], self.errors[x]] for x in self.counts],
+            "total": self.total
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SpaceSaving":
+        """Rebuild a counter table produced by to_dict"""
+        sketch = cls(data["capacity"])
+        for x, count, error in data["items"]:
+            sketch.counts[float(x)] = int(count)
+            sketch.errors[float(x)] = int(error)
+        sketch.total = int(data["total"])
+        sketch._rebuild_heap()
+        return sketch
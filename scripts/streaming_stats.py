@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Streaming Statistics
+====================
+Single-pass building blocks for the calculator engine's statistics.
+
+The accumulator keeps only a handful of running numbers (count, mean,
+M2, min, max), so it can summarize a stream that never fits in a list.
+Two accumulators can be merged, which lets separate workers summarize
+their own shard of the data and combine the partials at the end.
+file_statistics() uses exactly that to summarize large binary dumps on a
+process pool, with every worker memory-mapping its own slice of the file.
+
+RollingStatistics and rolling_window_arrays() cover the "last N samples"
+case: one keeps a live window with O(1) updates, the other backfills a
+whole array at once.
+
+Exact median and mode need the whole data set, so they are only reported
+when the accumulator is created with sketch=True (see sketches.py).
+"""
+
+import math
+import os
+from collections import deque
+from typing import Any, Dict, Iterable, Optional
+
+from sketches import SpaceSaving, TDigest
+
+from optional_deps import NUMPY_AVAILABLE, np
+
+
+class StatisticsAccumulator:
+    """
+    O(1)-memory running statistics using Welford's algorithm
+    Partial results are combined with the parallel (Chan et al.) update
+    """
+
+    def __init__(self, sketch: bool = False, compression: float = 100,
+                 heavy_hitters: int = 64):
+        """
+        Start with an empty summary
+        With sketch=True, a t-digest and a Space-Saving table estimate median and mode
+        """
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.digest = TDigest(compression) if sketch else None
+        self.heavy = SpaceSaving(heavy_hitters) if sketch else None
+
+    @classmethod
+    def from_moments(cls, count: int, mean: float, m2: float,
+                     minimum: float, maximum: float) -> "StatisticsAccumulator":
+        """Rebuild an accumulator from previously computed partial moments"""
+        acc = cls()
+        acc.count = int(count)
+        acc.mean = float(mean)
+        acc.m2 = float(m2)
+        acc.min = float(minimum)
+        acc.max = float(maximum)
+        return acc
+
+    def push(self, x: float) -> None:
+        """Add a single value"""
+        x = float(x)
+        if self.digest is not None:
+            self.digest.push(x)
+            self.heavy.push(x)
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+
+    def push_many(self, values: Iterable[float]) -> None:
+        """
+        Add a chunk of values
+        NumPy arrays are reduced in one vectorized pass and merged in
+        """
+        if NUMPY_AVAILABLE:
+            chunk = np.asarray(values, dtype=float).ravel()
+            if chunk.size == 0:
+                return
+            if self.digest is not None:
+                self.digest.push_many(chunk)
+                self.heavy.push_many(chunk)
+            chunk_mean = float(chunk.mean())
+            self._merge_moments(
+                chunk.size,
+                chunk_mean,
+                float(np.square(chunk - chunk_mean).sum()),
+                float(chunk.min()),
+                float(chunk.max())
+            )
+        else:
+            for x in values:
+                self.push(x)
+
+    def merge(self, other: "StatisticsAccumulator") -> "StatisticsAccumulator":
+        """Fold another accumulator's summary into this one and return self"""
+        if (self.digest is None) != (other.digest is None):
+            raise ValueError("Cannot merge sketched and unsketched accumulators")
+        if other.count:
+            self._merge_moments(other.count, other.mean, other.m2, other.min, other.max)
+            if self.digest is not None:
+                self.digest.merge(other.digest)
+                self.heavy.merge(other.heavy)
+        return self
+
+    def _merge_moments(self, count: int, mean: float, m2: float,
+                       minimum: float, maximum: float) -> None:
+        """Combine partial moments with the current summary"""
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+
+    @property
+    def variance(self) -> float:
+        """Population variance, matching CalculatorEngine.statistics"""
+        return self.m2 / self.count if self.count else 0.0
+
+    def error_bounds(self) -> Dict[str, float]:
+        """Configured accuracy of the sketched median and mode (empty without sketches)"""
+        if self.digest is None:
+            return {}
+        return {
+            "median_rank_error": self.digest.rank_error,
+            "mode_count_error": self.heavy.count_error
+        }
+
+    def result(self) -> Dict[str, Optional[Any]]:
+        """
+        Summary with the same keys as CalculatorEngine.statistics
+        Median and mode are None unless the accumulator keeps sketches
+        """
+        if not self.count:
+            raise ValueError("Data list cannot be empty")
+
+        variance = self.variance
+        sketched = self.digest is not None
+        return {
+            "mean": self.mean,
+            "median": self.digest.quantile(0.5) if sketched else None,
+            "mode": self.heavy.mode() if sketched else None,
+            "std_dev": math.sqrt(variance),
+            "variance": variance,
+            "range": self.max - self.min,
+            "min": self.min,
+            "max": self.max,
+            "count": self.count
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain, JSON-serializable form for shipping partial results between workers"""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.min,
+            "max": self.max,
+            "digest": self.digest.to_dict() if self.digest is not None else None,
+            "heavy": self.heavy.to_dict() if self.heavy is not None else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StatisticsAccumulator":
+        """Rebuild an accumulator produced by to_dict"""
+        acc = cls.from_moments(data["count"], data["mean"], data["m2"],
+                               data["min"], data["max"])
+        if data.get("digest") is not None:
+            acc.digest = TDigest.from_dict(data["digest"])
+            acc.heavy = SpaceSaving.from_dict(data["heavy"])
+        return acc
+
+
+# ============================================
+# SLIDING-WINDOW STATISTICS
+# ============================================
+
+class RollingStatistics:
+    """
+    Mean, std, min and max over the last `window` samples
+    Moments use a sliding Welford update, recomputed exactly once per window;
+    min/max use monotonic deques
+    """
+
+    def __init__(self, window: int):
+        """Create an empty window of the given size"""
+        if window < 1:
+            raise ValueError("Window must be at least 1")
+        self.window = int(window)
+        self._values = deque()
+        self._mins = deque()
+        self._maxs = deque()
+        self._index = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def push(self, x: float) -> None:
+        """Add a sample, dropping the oldest one once the window is full"""
+        x = float(x)
+        self._values.append(x)
+
+        if len(self._values) > self.window:
+            old = self._values.popleft()
+            if self._index % self.window == 0:
+                self._recompute()
+            else:
+                new_mean = self.mean + (x - old) / self.window
+                self.m2 += (x - old) * (x - new_mean + old - self.mean)
+                self.mean = new_mean
+        else:
+            delta = x - self.mean
+            self.mean += delta / len(self._values)
+            self.m2 += delta * (x - self.mean)
+
+        # Each deque holds (index, value) pairs that can still become the extreme
+        while self._mins and self._mins[-1][1] >= x:
+            self._mins.pop()
+        self._mins.append((self._index, x))
+        while self._maxs and self._maxs[-1][1] <= x:
+            self._maxs.pop()
+        self._maxs.append((self._index, x))
+
+        expired = self._index - self.window
+        if self._mins[0][0] <= expired:
+            self._mins.popleft()
+        if self._maxs[0][0] <= expired:
+            self._maxs.popleft()
+        self._index += 1
+
+    def _recompute(self) -> None:
+        """
+        Exact two-pass moments of the current window
+        Run once per `window` pushes (O(1) amortized), so rounding error from
+        the sliding updates never builds up over a long stream
+        """
+        self.mean = math.fsum(self._values) / len(self._values)
+        self.m2 = math.fsum((v - self.mean) ** 2 for v in self._values)
+
+    @property
+    def count(self) -> int:
+        """Number of samples currently in the window"""
+        return len(self._values)
+
+    def result(self) -> Dict[str, Any]:
+        """Current window summary (population variance, like statistics())"""
+        if not self._values:
+            raise ValueError("Data list cannot be empty")
+        variance = max(self.m2 / len(self._values), 0.0)
+        return {
+            "mean": self.mean,
+            "std_dev": math.sqrt(variance),
+            "variance": variance,
+            "min": self._mins[0][1],
+            "max": self._maxs[0][1],
+            "count": len(self._values)
+        }
+
+
+# Windows per block of rolling_window_arrays() (each block gets its own anchor)
+ROLLING_BLOCK = 4096
+
+
+def _sliding_extreme(values, window: int, ufunc, identity: float):
+    """
+    Sliding min/max in O(n) with block prefix/suffix scans (van Herk/Gil-Werman)
+    Returns one value per full window
+    """
+    n = values.size
+    blocks = -(-n // window)
+    padded = np.full(blocks * window, identity)
+    padded[:n] = values
+    padded = padded.reshape(blocks, window)
+
+    prefix = ufunc.accumulate(padded, axis=1).ravel()
+    suffix = ufunc.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    starts = np.arange(n - window + 1)
+    return ufunc(suffix[starts], prefix[starts + window - 1])
+
+
+def rolling_window_arrays(values, window: int) -> Dict[str, Any]:
+    """
+    Rolling mean, std, min and max over a whole array in one vectorized pass
+    Entry i summarizes values[i:i + window]
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("Rolling backfills require numpy")
+
+    values = np.asarray(values, dtype=float).ravel()
+    if window < 1:
+        raise ValueError("Window must be at least 1")
+    if values.size < window:
+        raise ValueError("Data is shorter than the window")
+
+    # Running sums are taken per block of windows, shifted by that block's own
+    # mean: a global anchor lets drifting data swamp E[x^2] - E[x]^2 with
+    # cancellation error, a local one keeps it at the scale of the window
+    count = values.size - window + 1
+    block = max(window, ROLLING_BLOCK)
+    mean = np.empty(count)
+    variance = np.empty(count)
+    for start in range(0, count, block):
+        stop = min(start + block, count)
+        segment = values[start:stop + window - 1]
+        anchor = segment.mean()
+        shifted = segment - anchor
+        sums = np.concatenate(([0.0], np.cumsum(shifted)))
+        squares = np.concatenate(([0.0], np.cumsum(shifted * shifted)))
+        block_mean = (sums[window:] - sums[:-window]) / window
+        block_squares = (squares[window:] - squares[:-window]) / window
+        mean[start:stop] = block_mean + anchor
+        variance[start:stop] = np.maximum(block_squares - block_mean * block_mean, 0.0)
+
+    return {
+        "mean": mean,
+        "std_dev": np.sqrt(variance),
+        "variance": variance,
+        "min": _sliding_extreme(values, window, np.minimum, np.inf),
+        "max": _sliding_extreme(values, window, np.maximum, -np.inf)
+    }
+
+
+# ============================================
+# MEMORY-MAPPED FILE STATISTICS
+# ============================================
+
+# Elements per worker task (64 MB of float64)
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def _open_mapped(path: str, dtype: str):
+    """Memory-map a .npy file or a raw binary dump as a flat read-only array"""
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r").reshape(-1)
+    return np.memmap(path, dtype=dtype, mode="r")
+
+
+def _chunk_summary(path: str, dtype: str, start: int, stop: int,
+                   sketch_options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Serialized summary of one slice of a mapped file
+    Runs inside a worker process; only the slice bounds are sent to it
+    """
+    if sketch_options is None:
+        acc = StatisticsAccumulator()
+    else:
+        acc = StatisticsAccumulator(sketch=True, **sketch_options)
+    acc.push_many(_open_mapped(path, dtype)[start:stop])
+    return acc.to_dict()
+
+
+def file_statistics(path: str, dtype: str = "float64",
+                    chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    max_workers: Optional[int] = None,
+                    sketch_options: Optional[Dict[str, Any]] = None) -> StatisticsAccumulator:
+    """
+    Summarize a float64/float32 binary file (or .npy) without loading it
+    Chunks are reduced on a process pool and the partials merged in order
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("File statistics require numpy")
+
+    total = _open_mapped(path, dtype).size
+    if total == 0:
+        raise ValueError("Data list cannot be empty")
+
+    bounds = [(start, min(start + chunk_size, total))
+              for start in range(0, total, chunk_size)]
+    workers = min(max_workers or os.cpu_count() or 1, len(bounds))
+
+    if workers == 1:
+        partials = [_chunk_summary(path, dtype, start, stop, sketch_options)
+                    for start, stop in bounds]
+    else:
+        # Deferred: multiprocessing is slow to import and only needed here
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(
+                _chunk_summary,
+                [path] * len(bounds),
+                [dtype] * len(bounds),
+                [start for start, _ in bounds],
+                [stop for _, stop in bounds],
+                [sketch_options] * len(bounds)
+            ))
+
+    if sketch_options is None:
+        acc = StatisticsAccumulator()
+    else:
+        acc = StatisticsAccumulator(sketch=True, **sketch_options)
+    for partial in partials:
+        acc.merge(StatisticsAccumulator.from_dict(partial))
+    return acc
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Lightweight SVG Plotting
+========================
+Writes a single-curve function graph as a small SVG document by hand.
+
+For the common "one line on axes" graph this is all that's needed: a
+polyline, a grid, axis lines and tick labels. It never imports
+matplotlib, so it is much faster on a cold start and produces files a
+fraction of the size of the PNG renderer's output.
+"""
+
+import math
+from html import escape
+from typing import List, Optional, Tuple
+
+from optional_deps import NUMPY_AVAILABLE, np
+
+
+# Canvas size and plot margins, in pixels
+WIDTH, HEIGHT = 800, 480
+MARGIN_LEFT, MARGIN_RIGHT, MARGIN_TOP, MARGIN_BOTTOM = 70, 20, 40, 50
+
+
+def nice_ticks(low: float, high: float, target: int = 6) -> List[float]:
+    """Round tick positions (steps of 1, 2 or 5 x 10^k) covering [low, high]"""
+    span = high - low
+    if span <= 0:
+        return [low]
+    raw = span / target
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude >= raw)
+    first = math.ceil(low / step) * step
+    count = int(math.floor((high - first) / step + 1e-9)) + 1
+    return [round(first + i * step, 12) for i in range(count)]
+
+
+def _y_bounds(y, y_limits: Optional[Tuple[float, float]]) -> Tuple[float, float]:
+    """Visible y range: the given limits, or the finite data range with padding"""
+    if y_limits:
+        return y_limits
+    finite = y[np.isfinite(y)]
+    if finite.size == 0:
+        return -1.0, 1.0
+    low, high = float(finite.min()), float(finite.max())
+    if low == high:
+        return low - 1, high + 1
+    pad = (high - low) * 0.05
+    return low - pad, high + pad
+
+
+def render_svg(x, y, title: str, y_limits: Optional[Tuple[float, float]] = None,
+               width: int = WIDTH, height: int = HEIGHT,
+               x_label: str = "x", y_label: str = "f(x)") -> bytes:
+    """
+    Render one curve with axes, grid and labels as SVG bytes
+    NaN values in y split the curve into separate polylines
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("SVG plotting requires numpy")
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    x_min, x_max = float(x.min()), float(x.max())
+    if x_min == x_max:
+        x_min, x_max = x_min - 1, x_max + 1
+    y_min, y_max = _y_bounds(y, y_limits)
+
+    left, top = MARGIN_LEFT, MARGIN_TOP
+    plot_w = width - MARGIN_LEFT - MARGIN_RIGHT
+    plot_h = height - MARGIN_TOP - MARGIN_BOTTOM
+
+    def to_px(value):
+        return left + (value - x_min) / (x_max - x_min) * plot_w
+
+    def to_py(value):
+        return top + (y_max - value) / (y_max - y_min) * plot_h
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="sans-serif" font-size="12">',
+        f'<defs><clipPath id="plot"><rect x="{left}" y="{top}" '
+        f'width="{plot_w}" height="{plot_h}"/></clipPath></defs>',
+        f'<rect width="{width}" height="{height}" fill="white"/>',
+        f'<text x="{left + plot_w / 2:.1f}" y="{top - 14}" text-anchor="middle" '
+        f'font-size="14">{escape(title, quote=False)}</text>'
+    ]
+
+    # Grid and tick labels
+    grid = []
+    for tick in nice_ticks(x_min, x_max):
+        px = to_px(tick)
+        grid.append(f'M{px:.1f} {top}V{top + plot_h}')
+        parts.append(f'<text x="{px:.1f}" y="{top + plot_h + 16}" '
+                     f'text-anchor="middle">{tick:g}</text>')
+    for tick in nice_ticks(y_min, y_max):
+        py = to_py(tick)
+        grid.append(f'M{left} {py:.1f}H{left + plot_w}')
+        parts.append(f'<text x="{left - 6}" y="{py + 4:.1f}" '
+                     f'text-anchor="end">{tick:g}</text>')
+    parts.append(f'<path d="{"".join(grid)}" stroke="#000" stroke-opacity="0.12"/>')
+
+    # Axis lines through the origin, when it is in view
+    axes = []
+    if y_min <= 0 <= y_max:
+        axes.append(f'M{left} {to_py(0):.1f}H{left + plot_w}')
+    if x_min <= 0 <= x_max:
+        axes.append(f'M{to_px(0):.1f} {top}V{top + plot_h}')
+    if axes:
+        parts.append(f'<path d="{"".join(axes)}" stroke="#000" stroke-width="0.7"/>')
+    parts.append(f'<rect x="{left}" y="{top}" width="{plot_w}" height="{plot_h}" '
+                 f'fill="none" stroke="#000" stroke-width="0.8"/>')
+
+    # The curve: one polyline per run of finite points
+    finite = np.isfinite(y)
+    px = to_px(x)
+    py = np.clip(to_py(np.where(finite, y, 0.0)), -10 * height, 11 * height)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], finite.astype(np.int8), [0]))))
+    for start, stop in zip(edges[::2], edges[1::2]):
+        points = " ".join(map("{:.1f},{:.1f}".format, px[start:stop], py[start:stop]))
+        parts.append(f'<polyline points="{points}" fill="none" stroke="#0000ff" '
+                     f'stroke-width="2" clip-path="url(#plot)"/>')
+
+    parts.append(f'<text x="{left + plot_w / 2:.1f}" y="{height - 12}" '
+                 f'text-anchor="middle">{escape(x_label, quote=False)}</text>')
+    parts.append(f'<text x="16" y="{top + plot_h / 2:.1f}" text-anchor="middle" '
+                 f'transform="rotate(-90 16 {top + plot_h / 2:.1f})">{escape(y_label, quote=False)}</text>')
+    parts.append('</svg>')
+    return "\n".join(parts).encode("utf-8")